@@ -1,6 +1,7 @@
 import random
 from chess_engine.evaluator import ClassicEvaluator
 from chess_engine.search import SearchEngine
+from chess_engine.ponder import Ponderer
 import chess
 import pygame
 
@@ -36,6 +37,9 @@ promotion_choice = None   # will store the chosen piece type
 # set up evaluator and search engine
 evaluator = ClassicEvaluator()
 engine = SearchEngine(evaluator)
+# searches the expected reply in the background while the player thinks
+ponderer = Ponderer(engine)
+SEARCH_DEPTH = 4
 
 # --- Helper functions ---
 def draw_board():
@@ -198,6 +202,7 @@ def draw_message():
 def reset_game():
     """reset game state to start a new game"""
     global board, selected_square, game_over, message
+    ponderer.stop()
     board = chess.Board()
     selected_square = None
     game_over = False
@@ -228,9 +233,15 @@ def make_computer_move():
     global game_over
 
     if not game_over:
-        best_move, score = engine.get_best_move(board, depth=4)
+        # ponder hit: the background search already has the answer (or most of it)
+        result = ponderer.finish(board, SEARCH_DEPTH)
+        if result is None:
+            result = engine.get_best_move(board, depth=SEARCH_DEPTH)
+        best_move, score, _elapsed = result
         board.push(best_move)
         check_game_over()
+        if not game_over:
+            ponderer.start(board)
 
 
 # --- Main loop ---
@@ -247,6 +258,8 @@ while running:
     button_rect = draw_message()
 
     pygame.display.flip()
+    # don't spin, the ponder thread needs the CPU
+    clock.tick(30)
 
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
@@ -311,4 +324,5 @@ while running:
             if button_rect and button_rect.collidepoint(event.pos):
                 reset_game()
 
+ponderer.stop()
 pygame.quit()
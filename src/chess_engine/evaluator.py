@@ -1,7 +1,9 @@
 import chess
+import chess.polyglot
+from array import array
 
 class ClassicEvaluator:
-    def __init__(self):
+    def __init__(self, eval_cache_size=1 << 16, pawn_cache_size=1 << 14):
         # -------------------------------------------------------------------------
         # PeSTO Piece-Square Tables (Midgame and Endgame)
         # Standard localised values used in many engines (RofChade, etc)
@@ -224,6 +226,12 @@ class ClassicEvaluator:
             chess.ROOK: 2, chess.QUEEN: 4, chess.KING: 0
         }
 
+        # material + PST folded into one signed table per phase (white +, black -)
+        # psqt_mg[color][piece_type][square], filled by build_psqt()
+        self.psqt_mg = None
+        self.psqt_eg = None
+        self.build_psqt()
+
         # =====================================================================
         # NEW FEATURE WEIGHTS (placeholder — to be tuned via regression)
         # All values in centipawns. Kept deliberately small so the engine
@@ -310,51 +318,199 @@ class ClassicEvaluator:
             for sq in range(64)
         ]
 
+        # =====================================================================
+        # Evaluation cache
+        # Direct-mapped table of (position key -> score), the same leaf positions
+        # come up again and again across iterations and sibling lines.
+        # eval_cache_size is the number of entries (rounded down to a power of two),
+        # 0 disables the cache (e.g. for tuning runs where the weights change).
+        # =====================================================================
+        self.eval_cache_size = 0
+        self.eval_cache_mask = 0
+        self.eval_cache_keys = None
+        self.eval_cache_scores = None
+        self.eval_cache_hits = 0
+        self.eval_cache_misses = 0
+        self.resize_eval_cache(eval_cache_size)
 
-    def evaluate(self, board: chess.Board):
+        # =====================================================================
+        # Pawn hash
+        # The pawn structure terms only depend on the two pawn bitboards, which
+        # hardly change inside a search, so they are cached separately and hit
+        # even when the full evaluation cache misses.
+        # Direct-mapped list of (white_pawns, black_pawns, mg, eg, white_passers,
+        # black_passers) tuples, passers as bitboards. Size 0 disables it.
+        # =====================================================================
+        self.pawn_cache_size = 0
+        self.pawn_cache_mask = 0
+        self.pawn_cache = None
+        self.pawn_cache_hits = 0
+        self.pawn_cache_misses = 0
+        self.resize_pawn_cache(pawn_cache_size)
+
+    def resize_eval_cache(self, size):
+        """Reallocate (and empty) the evaluation cache, size 0 disables it."""
+        self.eval_cache_size = 1 << (size.bit_length() - 1) if size > 0 else 0
+        self.eval_cache_mask = self.eval_cache_size - 1
+        self.eval_cache_keys = array('Q', bytes(8 * self.eval_cache_size))
+        self.eval_cache_scores = array('d', bytes(8 * self.eval_cache_size))
+        self.eval_cache_hits = 0
+        self.eval_cache_misses = 0
+
+    def resize_pawn_cache(self, size):
+        """Reallocate (and empty) the pawn hash, size 0 disables it."""
+        self.pawn_cache_size = 1 << (size.bit_length() - 1) if size > 0 else 0
+        self.pawn_cache_mask = self.pawn_cache_size - 1
+        self.pawn_cache = [None] * self.pawn_cache_size
+        self.pawn_cache_hits = 0
+        self.pawn_cache_misses = 0
+
+    def clear_eval_cache(self):
+        """Forget every cached score (call after changing any weight)."""
+        self.build_psqt()
+        self.resize_eval_cache(self.eval_cache_size)
+        self.resize_pawn_cache(self.pawn_cache_size)
+
+    def build_psqt(self):
+        """(Re)build the combined material + PST tables from the weights."""
+        self.psqt_mg = [[[0] * 64 for _ in range(7)] for _ in range(2)]
+        self.psqt_eg = [[[0] * 64 for _ in range(7)] for _ in range(2)]
+        for color in [chess.WHITE, chess.BLACK]:
+            sign = 1 if color == chess.WHITE else -1
+            for pt in range(chess.PAWN, chess.KING + 1):
+                mg_table = self.tables[pt][color]['mg']
+                eg_table = self.tables[pt][color]['eg']
+                for sq in range(64):
+                    self.psqt_mg[color][pt][sq] = sign * (self.mg_value[pt] + mg_table[sq])
+                    self.psqt_eg[color][pt][sq] = sign * (self.eg_value[pt] + eg_table[sq])
+
+    def psqt(self, board: chess.Board):
         """
-        Returns a decimal score from the perspective of White.
-        (+) White winning, (-) Black winning.
+        Material + PST totals and game phase of a position, summed over all pieces.
+        Returns (mg, eg, phase), mg/eg in centipawns from White's side.
         """
-        # Check for game over conditions
-        if board.is_checkmate():
-            if board.turn == chess.WHITE:
-                return -9999.0 # Black wins
-            else:
-                return 9999.0 # White wins
-        if board.is_insufficient_material() or board.is_stalemate():
-            return 0.0
-
-        # Setup variables
         mg_score = 0
         eg_score = 0
         game_phase = 0
 
-        # Iterate over all pieces to sum material + PST
         # Note: python-chess piece maps are faster than iterating all 64 squares
         for idx, piece in board.piece_map().items():
             pt = piece.piece_type
             color = piece.color
+            mg_score += self.psqt_mg[color][pt][idx]
+            eg_score += self.psqt_eg[color][pt][idx]
+            game_phase += self.game_phase_inc[pt]
 
-            # fast dictionary lookup
-            mg_table = self.tables[pt][color]['mg']
-            eg_table = self.tables[pt][color]['eg']
-
-            # Calculate score: material + position
-            mg_val = self.mg_value[pt] + mg_table[idx]
-            eg_val = self.eg_value[pt] + eg_table[idx]
+        return mg_score, eg_score, game_phase
 
-            if color == chess.WHITE:
-                mg_score += mg_val
-                eg_score += eg_val
+    def psqt_after_move(self, board: chess.Board, psqt, move):
+        """
+        Returns the (mg, eg, phase) totals after `move`, given those of the
+        current position. Must be called *before* the move is pushed.
+        Handles captures, promotions, castling and en passant (null moves change nothing).
+        """
+        if not move:
+            return psqt
+        mg_score, eg_score, game_phase = psqt
+
+        us = board.turn
+        them = not us
+        from_sq = move.from_square
+        to_sq = move.to_square
+        pt = board.piece_type_at(from_sq)
+        our_mg = self.psqt_mg[us]
+        our_eg = self.psqt_eg[us]
+
+        mg_score -= our_mg[pt][from_sq]
+        eg_score -= our_eg[pt][from_sq]
+
+        if pt == chess.KING and board.is_castling(move):
+            # king lands on the g/c file, rook jumps to the f/d file
+            rank = chess.square_rank(from_sq)
+            if chess.square_file(to_sq) > chess.square_file(from_sq):
+                rook_from, rook_to, king_to = chess.square(7, rank), chess.square(5, rank), chess.square(6, rank)
             else:
-                mg_score -= mg_val
-                eg_score -= eg_val
+                rook_from, rook_to, king_to = chess.square(0, rank), chess.square(3, rank), chess.square(2, rank)
+            mg_score += our_mg[chess.ROOK][rook_to] - our_mg[chess.ROOK][rook_from] + our_mg[chess.KING][king_to]
+            eg_score += our_eg[chess.ROOK][rook_to] - our_eg[chess.ROOK][rook_from] + our_eg[chess.KING][king_to]
+            return mg_score, eg_score, game_phase
+
+        captured = board.piece_type_at(to_sq)
+        captured_sq = to_sq
+        if not captured and pt == chess.PAWN and to_sq == board.ep_square:
+            # en passant: the captured pawn is behind the target square
+            captured = chess.PAWN
+            captured_sq = to_sq - 8 if us == chess.WHITE else to_sq + 8
+        if captured:
+            mg_score -= self.psqt_mg[them][captured][captured_sq]
+            eg_score -= self.psqt_eg[them][captured][captured_sq]
+            game_phase -= self.game_phase_inc[captured]
+
+        new_pt = move.promotion or pt
+        mg_score += our_mg[new_pt][to_sq]
+        eg_score += our_eg[new_pt][to_sq]
+        if move.promotion:
+            game_phase += self.game_phase_inc[new_pt]
+
+        return mg_score, eg_score, game_phase
+
+    def terminal_score(self, board: chess.Board):
+        """Score of a finished game (mate, stalemate, insufficient material), None if it goes on."""
+        if board.is_checkmate():
+            if board.turn == chess.WHITE:
+                return -9999.0 # Black wins
+            else:
+                return 9999.0 # White wins
+        if board.is_insufficient_material() or board.is_stalemate():
+            return 0.0
+        return None
 
-            # Game Phase evaluation
-            if pt != chess.PAWN and pt != chess.KING: 
-                game_phase += self.game_phase_inc[pt]
+    def evaluate(self, board: chess.Board, key=None, psqt=None, terminal_checks=True):
+        """
+        Returns a decimal score from the perspective of White.
+        (+) White winning, (-) Black winning.
+        `key` is the position's Zobrist key and `psqt` its (mg, eg, phase) totals
+        (see psqt_after_move) if the caller already has them (the search does).
+        terminal_checks=False skips the game over tests, for callers (the search)
+        that already know the game goes on.
+        """
+        if terminal_checks:
+            score = self.terminal_score(board)
+            if score is not None:
+                return score
+
+        if not self.eval_cache_size:
+            return self.evaluate_uncached(board, psqt, terminal_checks=False)
+
+        if key is None:
+            key = chess.polyglot.zobrist_hash(board)
+        idx = key & self.eval_cache_mask
+        if self.eval_cache_keys[idx] == key:
+            self.eval_cache_hits += 1
+            return self.eval_cache_scores[idx]
+
+        self.eval_cache_misses += 1
+        score = self.evaluate_uncached(board, psqt, terminal_checks=False)
+        self.eval_cache_keys[idx] = key
+        self.eval_cache_scores[idx] = score
+        return score
+
+    def evaluate_uncached(self, board: chess.Board, psqt=None, terminal_checks=True):
+        """
+        Full static evaluation, bypassing the cache.
+        Returns a decimal score from the perspective of White.
+        """
+        # Check for game over conditions
+        if terminal_checks:
+            score = self.terminal_score(board)
+            if score is not None:
+                return score
 
+        # material + PST + game phase, updated incrementally by the search
+        # when it passes them in, otherwise summed over all pieces
+        if psqt is None:
+            psqt = self.psqt(board)
+        mg_score, eg_score, game_phase = psqt
 
         # Mobility bonuses
         mobility_bonus = {
@@ -380,140 +536,12 @@ class ClassicEvaluator:
                 mg_score -= val
                 eg_score -= val
 
-        # PAWN STRUCTURE
+        # PAWN STRUCTURE (cached, depends only on the two pawn bitboards)
         white_pawns_bb = board.occupied_co[chess.WHITE] & board.pawns
         black_pawns_bb = board.occupied_co[chess.BLACK] & board.pawns
-        doubled_penalty = 15
-        isolated_penalty = 20
-
-        # passed pawns bonuses (by rank)
-        passed_mg = [0, 5, 10, 20, 35, 60, 100, 0]
-        passed_eg = [0, 10, 20, 40, 70, 120, 200, 0]
-
-        # Track passed pawns for king-passer proximity (NEW 8)
-        white_passers = []
-        black_passers = []
-
-        # white pawns
-        for square in board.pieces(chess.PAWN, chess.WHITE):
-            file = chess.square_file(square)
-            rank = chess.square_rank(square)
-
-            # ISOLATED pawns
-            adjacent_files_mask = 0
-            if file > 0: adjacent_files_mask |= chess.BB_FILES[file - 1]
-            if file < 7: adjacent_files_mask |= chess.BB_FILES[file + 1]
-            if (white_pawns_bb & adjacent_files_mask) == 0:
-                mg_score -= isolated_penalty
-                eg_score -= isolated_penalty
-
-            # DOUBLED pawns
-            file_mask = chess.BB_FILES[file]
-            if (white_pawns_bb & file_mask).bit_count() > 1:
-                mg_score -= doubled_penalty
-                eg_score -= doubled_penalty
-
-            # PASSED pawns
-            front_span_files = adjacent_files_mask | file_mask
-            ranks_ahead_mask = ~((1 << (8 * (rank + 1))) - 1)
-            is_passed = (black_pawns_bb & front_span_files & ranks_ahead_mask) == 0
-
-            if is_passed:
-                mg_score += passed_mg[rank]
-                eg_score += passed_eg[rank]
-                white_passers.append(square)
-
-            # --- [NEW 4] BACKWARD pawns ---
-            # A pawn is backward if:
-            #   1) no friendly pawn on adjacent files is on the same rank or behind
-            #      (i.e. it can't be supported by advancing a neighbouring pawn)
-            #   2) the stop square (one square ahead) is controlled by an enemy pawn
-            if adjacent_files_mask:
-                ranks_behind_or_equal = (1 << (8 * (rank + 1))) - 1
-                has_support = (white_pawns_bb & adjacent_files_mask & ranks_behind_or_equal) != 0
-                if not has_support:
-                    stop_sq = square + 8  # one rank ahead for white
-                    if stop_sq <= 63:
-                        # is stop square attacked by an enemy pawn?
-                        stop_file = chess.square_file(stop_sq)
-                        stop_rank = chess.square_rank(stop_sq)
-                        # enemy pawn attacks stop_sq from rank+1 on adjacent files
-                        left_attacker = chess.square(stop_file - 1, stop_rank + 1) if stop_file > 0 and stop_rank < 7 else None
-                        right_attacker = chess.square(stop_file + 1, stop_rank + 1) if stop_file < 7 and stop_rank < 7 else None
-                        enemy_controls_stop = False
-                        if left_attacker is not None and board.piece_at(left_attacker) == chess.Piece(chess.PAWN, chess.BLACK):
-                            enemy_controls_stop = True
-                        if right_attacker is not None and board.piece_at(right_attacker) == chess.Piece(chess.PAWN, chess.BLACK):
-                            enemy_controls_stop = True
-                        if enemy_controls_stop:
-                            mg_score -= self.mg_backward_penalty
-                            eg_score -= self.eg_backward_penalty
-
-            # --- [NEW 5] CONNECTED pawns ---
-            # Check if this pawn is defended by a friendly pawn (diagonally behind).
-            defend_left  = chess.square(file - 1, rank - 1) if file > 0 and rank > 0 else None
-            defend_right = chess.square(file + 1, rank - 1) if file < 7 and rank > 0 else None
-            if (defend_left is not None and board.piece_at(defend_left) == chess.Piece(chess.PAWN, chess.WHITE)) or \
-               (defend_right is not None and board.piece_at(defend_right) == chess.Piece(chess.PAWN, chess.WHITE)):
-                mg_score += self.mg_connected_bonus
-                eg_score += self.eg_connected_bonus
-
-        # black pawns
-        for square in board.pieces(chess.PAWN, chess.BLACK):
-            file = chess.square_file(square)
-            rank = chess.square_rank(square)
-
-            # ISOLATED pawns
-            adjacent_files_mask = 0
-            if file > 0: adjacent_files_mask |= chess.BB_FILES[file - 1]
-            if file < 7: adjacent_files_mask |= chess.BB_FILES[file + 1]
-            if (black_pawns_bb & adjacent_files_mask) == 0:
-                mg_score += isolated_penalty
-                eg_score += isolated_penalty
-
-            # DOUBLED pawns
-            file_mask = chess.BB_FILES[file]
-            if (black_pawns_bb & file_mask).bit_count() > 1:
-                mg_score += doubled_penalty
-                eg_score += doubled_penalty
-
-            # PASSED pawns
-            front_span_files = adjacent_files_mask | file_mask
-            ranks_below_mask = (1 << (8 * rank)) - 1
-            is_passed = (white_pawns_bb & front_span_files & ranks_below_mask) == 0
-
-            if is_passed:
-                mg_score -= passed_mg[7 - rank]
-                eg_score -= passed_eg[7 - rank]
-                black_passers.append(square)
-
-            # --- [NEW 4] BACKWARD pawns (black) ---
-            if adjacent_files_mask:
-                ranks_above_or_equal = ~((1 << (8 * rank)) - 1) & 0xFFFFFFFFFFFFFFFF
-                has_support = (black_pawns_bb & adjacent_files_mask & ranks_above_or_equal) != 0
-                if not has_support:
-                    stop_sq = square - 8  # one rank ahead for black (downward)
-                    if stop_sq >= 0:
-                        stop_file = chess.square_file(stop_sq)
-                        stop_rank = chess.square_rank(stop_sq)
-                        left_attacker = chess.square(stop_file - 1, stop_rank - 1) if stop_file > 0 and stop_rank > 0 else None
-                        right_attacker = chess.square(stop_file + 1, stop_rank - 1) if stop_file < 7 and stop_rank > 0 else None
-                        enemy_controls_stop = False
-                        if left_attacker is not None and board.piece_at(left_attacker) == chess.Piece(chess.PAWN, chess.WHITE):
-                            enemy_controls_stop = True
-                        if right_attacker is not None and board.piece_at(right_attacker) == chess.Piece(chess.PAWN, chess.WHITE):
-                            enemy_controls_stop = True
-                        if enemy_controls_stop:
-                            mg_score += self.mg_backward_penalty
-                            eg_score += self.eg_backward_penalty
-
-            # --- [NEW 5] CONNECTED pawns (black) ---
-            defend_left  = chess.square(file - 1, rank + 1) if file > 0 and rank < 7 else None
-            defend_right = chess.square(file + 1, rank + 1) if file < 7 and rank < 7 else None
-            if (defend_left is not None and board.piece_at(defend_left) == chess.Piece(chess.PAWN, chess.BLACK)) or \
-               (defend_right is not None and board.piece_at(defend_right) == chess.Piece(chess.PAWN, chess.BLACK)):
-                mg_score -= self.mg_connected_bonus
-                eg_score -= self.eg_connected_bonus
+        pawn_mg, pawn_eg, white_passers, black_passers = self.probe_pawns(white_pawns_bb, black_pawns_bb)
+        mg_score += pawn_mg
+        eg_score += pawn_eg
 
         # bishop pair bonus
         bishop_pair_bonus = 30
@@ -722,7 +750,7 @@ class ClassicEvaluator:
             bk_file = chess.square_file(black_king)
             bk_rank = chess.square_rank(black_king)
 
-            for passer in white_passers:
+            for passer in chess.scan_forward(white_passers):
                 pf = chess.square_file(passer)
                 pr = chess.square_rank(passer)
                 # Own king close to own passer: bonus (lower distance = better)
@@ -733,7 +761,7 @@ class ClassicEvaluator:
                 # Bonus = enemy_dist means farther enemy king → higher bonus
                 eg_score += enemy_dist * self.eg_king_enemy_passer
 
-            for passer in black_passers:
+            for passer in chess.scan_forward(black_passers):
                 pf = chess.square_file(passer)
                 pr = chess.square_rank(passer)
                 friend_dist = max(abs(bk_file - pf), abs(bk_rank - pr))
@@ -758,4 +786,142 @@ class ClassicEvaluator:
             final_score -= 15
 
         # return decimal score
-        return final_score / 100.0
\ No newline at end of file
+        return final_score / 100.0
+
+    def probe_pawns(self, white_pawns_bb, black_pawns_bb):
+        """
+        Pawn structure score through the pawn hash.
+        Returns (mg, eg, white_passers, black_passers) in centipawns from White's
+        side, passers as bitboards.
+        """
+        if not self.pawn_cache_size:
+            return self.evaluate_pawns(white_pawns_bb, black_pawns_bb)
+
+        idx = hash((white_pawns_bb, black_pawns_bb)) & self.pawn_cache_mask
+        entry = self.pawn_cache[idx]
+        if entry is not None and entry[0] == white_pawns_bb and entry[1] == black_pawns_bb:
+            self.pawn_cache_hits += 1
+            return entry[2:]
+
+        self.pawn_cache_misses += 1
+        result = self.evaluate_pawns(white_pawns_bb, black_pawns_bb)
+        self.pawn_cache[idx] = (white_pawns_bb, black_pawns_bb) + result
+        return result
+
+    def evaluate_pawns(self, white_pawns_bb, black_pawns_bb):
+        """
+        Isolated, doubled, passed, backward and connected pawns.
+        Returns (mg, eg, white_passers, black_passers) in centipawns from White's
+        side, passers as bitboards.
+        """
+        mg_score = 0
+        eg_score = 0
+        doubled_penalty = 15
+        isolated_penalty = 20
+
+        # passed pawns bonuses (by rank)
+        passed_mg = [0, 5, 10, 20, 35, 60, 100, 0]
+        passed_eg = [0, 10, 20, 40, 70, 120, 200, 0]
+
+        # Track passed pawns for king-passer proximity (NEW 8)
+        white_passers = 0
+        black_passers = 0
+
+        # white pawns
+        for square in chess.scan_forward(white_pawns_bb):
+            file = chess.square_file(square)
+            rank = chess.square_rank(square)
+
+            # ISOLATED pawns
+            adjacent_files_mask = 0
+            if file > 0: adjacent_files_mask |= chess.BB_FILES[file - 1]
+            if file < 7: adjacent_files_mask |= chess.BB_FILES[file + 1]
+            if (white_pawns_bb & adjacent_files_mask) == 0:
+                mg_score -= isolated_penalty
+                eg_score -= isolated_penalty
+
+            # DOUBLED pawns
+            file_mask = chess.BB_FILES[file]
+            if (white_pawns_bb & file_mask).bit_count() > 1:
+                mg_score -= doubled_penalty
+                eg_score -= doubled_penalty
+
+            # PASSED pawns
+            front_span_files = adjacent_files_mask | file_mask
+            ranks_ahead_mask = ~((1 << (8 * (rank + 1))) - 1)
+            is_passed = (black_pawns_bb & front_span_files & ranks_ahead_mask) == 0
+
+            if is_passed:
+                mg_score += passed_mg[rank]
+                eg_score += passed_eg[rank]
+                white_passers |= chess.BB_SQUARES[square]
+
+            # --- [NEW 4] BACKWARD pawns ---
+            # A pawn is backward if:
+            #   1) no friendly pawn on adjacent files is on the same rank or behind
+            #      (i.e. it can't be supported by advancing a neighbouring pawn)
+            #   2) the stop square (one square ahead) is controlled by an enemy pawn
+            if adjacent_files_mask:
+                ranks_behind_or_equal = (1 << (8 * (rank + 1))) - 1
+                has_support = (white_pawns_bb & adjacent_files_mask & ranks_behind_or_equal) != 0
+                if not has_support:
+                    stop_sq = square + 8  # one rank ahead for white
+                    if stop_sq <= 63:
+                        # enemy pawns attacking the stop square stand where a white
+                        # pawn on the stop square would attack
+                        if chess.BB_PAWN_ATTACKS[chess.WHITE][stop_sq] & black_pawns_bb:
+                            mg_score -= self.mg_backward_penalty
+                            eg_score -= self.eg_backward_penalty
+
+            # --- [NEW 5] CONNECTED pawns ---
+            # Check if this pawn is defended by a friendly pawn (diagonally behind).
+            if chess.BB_PAWN_ATTACKS[chess.BLACK][square] & white_pawns_bb:
+                mg_score += self.mg_connected_bonus
+                eg_score += self.eg_connected_bonus
+
+        # black pawns
+        for square in chess.scan_forward(black_pawns_bb):
+            file = chess.square_file(square)
+            rank = chess.square_rank(square)
+
+            # ISOLATED pawns
+            adjacent_files_mask = 0
+            if file > 0: adjacent_files_mask |= chess.BB_FILES[file - 1]
+            if file < 7: adjacent_files_mask |= chess.BB_FILES[file + 1]
+            if (black_pawns_bb & adjacent_files_mask) == 0:
+                mg_score += isolated_penalty
+                eg_score += isolated_penalty
+
+            # DOUBLED pawns
+            file_mask = chess.BB_FILES[file]
+            if (black_pawns_bb & file_mask).bit_count() > 1:
+                mg_score += doubled_penalty
+                eg_score += doubled_penalty
+
+            # PASSED pawns
+            front_span_files = adjacent_files_mask | file_mask
+            ranks_below_mask = (1 << (8 * rank)) - 1
+            is_passed = (white_pawns_bb & front_span_files & ranks_below_mask) == 0
+
+            if is_passed:
+                mg_score -= passed_mg[7 - rank]
+                eg_score -= passed_eg[7 - rank]
+                black_passers |= chess.BB_SQUARES[square]
+
+            # --- [NEW 4] BACKWARD pawns (black) ---
+            if adjacent_files_mask:
+                ranks_above_or_equal = ~((1 << (8 * rank)) - 1) & 0xFFFFFFFFFFFFFFFF
+                has_support = (black_pawns_bb & adjacent_files_mask & ranks_above_or_equal) != 0
+                if not has_support:
+                    stop_sq = square - 8  # one rank ahead for black (downward)
+                    if stop_sq >= 0:
+                        if chess.BB_PAWN_ATTACKS[chess.BLACK][stop_sq] & white_pawns_bb:
+                            mg_score += self.mg_backward_penalty
+                            eg_score += self.eg_backward_penalty
+
+            # --- [NEW 5] CONNECTED pawns (black) ---
+            if chess.BB_PAWN_ATTACKS[chess.WHITE][square] & black_pawns_bb:
+                mg_score -= self.mg_connected_bonus
+                eg_score -= self.eg_connected_bonus
+
+        return mg_score, eg_score, white_passers, black_passers
@@ -224,19 +224,22 @@ class OldEvaluator:
             chess.ROOK: 2, chess.QUEEN: 4, chess.KING: 0
         }
 
-    def evaluate(self, board: chess.Board):
+    def evaluate(self, board: chess.Board, key=None, psqt=None, terminal_checks=True):
         """
         Returns a decimal score from the perspective of White.
         (+) White winning, (-) Black winning.
+        `key` and `psqt` are accepted for compatibility with ClassicEvaluator and ignored.
+        terminal_checks=False skips the game over tests (the search does its own).
         """
         # Check for game over conditions
-        if board.is_checkmate():
-            if board.turn == chess.WHITE:
-                return -9999.0 # Black wins
-            else:
-                return 9999.0 # White wins
-        if board.is_insufficient_material() or board.is_stalemate():
-            return 0.0
+        if terminal_checks:
+            if board.is_checkmate():
+                if board.turn == chess.WHITE:
+                    return -9999.0 # Black wins
+                else:
+                    return 9999.0 # White wins
+            if board.is_insufficient_material() or board.is_stalemate():
+                return 0.0
 
         # Setup variables
         mg_score = 0
@@ -0,0 +1,291 @@
+import chess
+import multiprocessing
+import queue
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from chess_engine.timeman import TimeManager
+from chess_engine.transposition import SharedTranspositionTable, TT_EXACT
+
+"""
+Multi-process search.
+
+Lazy SMP (SearchEngineTimed): several processes search the same root at the
+same time and only share a transposition table. There is no other communication
+during the search; the helpers speed up the main search by filling the table
+with results it would otherwise have to compute itself.
+
+Root splitting (SearchEngine, fixed depth): the first root move is searched in
+this process to get a bound, the remaining root moves are handed out to a pool
+of warm worker engines, each searched against the best score known when it is sent.
+"""
+
+# how long to wait for a helper to report once the stop flag is raised
+HELPER_TIMEOUT = 10.0
+
+# depth skipping for the helpers: helper i works on the depths where
+# (depth + SKIP_PHASE[i]) // SKIP_SIZE[i] is even, so helpers spread over
+# different depths instead of repeating each other's deterministic searches
+SKIP_SIZE = [1, 1, 2, 2, 2, 2, 3, 3, 3, 3, 3, 3, 4, 4, 4, 4, 4, 4, 4, 4]
+SKIP_PHASE = [0, 1, 0, 1, 2, 3, 0, 1, 2, 3, 4, 5, 0, 1, 2, 3, 4, 5, 6, 7]
+
+
+def engine_settings(engine):
+    """Search switches a worker engine needs to behave like `engine`"""
+    return {
+        "null_move": engine.null_move,
+        "null_verify": engine.null_verify,
+        "late_moves": engine.late_moves,
+        "frontier_pruning": engine.frontier_pruning,
+        "qsearch_max_ply": engine.qsearch_max_ply,
+    }
+
+
+def _helper_search(engine, board, time_limit, max_depth, worker_id):
+    """
+    Quiet iterative deepening for a helper process, skipping depths by its
+    place in the SKIP_SIZE / SKIP_PHASE pattern.
+    Returns (depth, move, score) for the deepest completed iteration, score from white's side.
+    """
+    skip = (worker_id - 1) % len(SKIP_SIZE)
+    skip_size = SKIP_SIZE[skip]
+    skip_phase = SKIP_PHASE[skip]
+
+    engine.nodes_visited = 0
+    engine.qsearch_nodes = 0
+    engine.start_clock(time_limit)
+    engine.tt.new_search()
+    engine.clear_heuristics()
+
+    result = (0, None, 0)
+    prev_score = None
+    for depth in range(1, max_depth + 1):
+        if (depth + skip_phase) // skip_size % 2 and depth < max_depth:
+            continue
+        engine.age_history()
+        move, score = engine.search_aspiration(board, depth, prev_score)
+        if engine.stop_search:
+            break
+        prev_score = score
+        if board.turn == chess.BLACK:
+            score = -score
+        result = (depth, move, score)
+    return result
+
+
+def _smp_worker(worker_id, evaluator, settings, root_fen, moves, tt_name, tt_size_mb, generation,
+                time_limit, max_depth, stop_event, results):
+    """Entry point of a helper process"""
+    from chess_engine.search_timed import SearchEngineTimed
+
+    engine = SearchEngineTimed(evaluator, tt_size_mb=1, **settings)
+    engine.tt = SharedTranspositionTable(tt_size_mb, tt_name)
+    engine.tt.generation = generation
+    engine.stop_event = stop_event
+
+    # rebuild the game so repetition detection sees the same history
+    board = chess.Board(root_fen)
+    for uci in moves:
+        board.push_uci(uci)
+
+    try:
+        depth, move, score = _helper_search(engine, board, time_limit, max_depth, worker_id)
+        results.put((worker_id, depth, move.uci() if move else None, score, engine.nodes_visited))
+    finally:
+        engine.tt.close()
+
+
+def lazy_smp_search(engine, board, time_limit, max_depth, workers,
+                    remaining=None, increment=0.0, moves_to_go=None):
+    """
+    Run engine.get_best_move with workers - 1 helper processes sharing its TT.
+    Returns (best_move, score, nodes, elapsed) like SearchEngineTimed.get_best_move,
+    with nodes summed over all processes and the move taken from the deepest
+    completed iteration of any process (the main search wins ties).
+    The main search manages the time, helpers run until it raises the stop flag
+    or they reach the hard limit.
+    The shared table is kept on the engine (engine.smp_tt) between searches,
+    engine.shutdown_pool() frees it.
+    """
+    start_time = time.time()
+    hard_limit = TimeManager(time_limit, remaining, increment, moves_to_go).hard
+    ctx = multiprocessing.get_context()
+    if engine.smp_tt is None or engine.smp_tt.size_mb != engine.tt.size_mb:
+        if engine.smp_tt is not None:
+            engine.smp_tt.close()
+        engine.smp_tt = SharedTranspositionTable(engine.tt.size_mb)
+    shared = engine.smp_tt
+    # the main search's get_best_move() starts the new generation, the helpers
+    # are told in advance so all processes age entries alike
+    generation = (shared.generation + 1) & 0x3F
+    stop_event = ctx.Event()
+    results = ctx.Queue()
+
+    settings = engine_settings(engine)
+    root_fen = board.root().fen()
+    moves = [move.uci() for move in board.move_stack]
+
+    helpers = []
+    for worker_id in range(1, workers):
+        proc = ctx.Process(
+            target=_smp_worker,
+            args=(worker_id, engine.evaluator, settings, root_fen, moves, shared.name, shared.size_mb,
+                  generation, hard_limit, max_depth, stop_event, results),
+            daemon=True,
+        )
+        proc.start()
+        helpers.append(proc)
+
+    # the main process searches too, on the shared table
+    local_tt = engine.tt
+    engine.tt = shared
+    try:
+        best_move, best_score, nodes, _ = engine.get_best_move(board, time_limit, max_depth,
+                                                               remaining=remaining, increment=increment,
+                                                               moves_to_go=moves_to_go)
+        best_depth = engine.depth_reached
+    finally:
+        engine.tt = local_tt
+        stop_event.set()
+
+    # collect the helpers' deepest completed iterations
+    for _ in helpers:
+        try:
+            worker_id, depth, uci, score, worker_nodes = results.get(timeout=HELPER_TIMEOUT)
+        except queue.Empty:
+            break
+        nodes += worker_nodes
+        if depth > best_depth and uci is not None:
+            move = chess.Move.from_uci(uci)
+            if move in board.legal_moves:
+                best_move, best_score, best_depth = move, score, depth
+
+    for proc in helpers:
+        proc.join(timeout=HELPER_TIMEOUT)
+        if proc.is_alive():
+            proc.terminate()
+
+    elapsed = time.time() - start_time
+    print(f"==> SMP ({workers} processes): {best_move} | Depth: {best_depth} | Nodes: {nodes} | "
+          f"NPS: {nodes / max(elapsed, 1e-9):.0f} | Time: {elapsed:.3f}s")
+
+    return best_move, best_score, nodes, elapsed
+
+
+# --- root splitting -------------------------------------------------------
+
+# per-process state of a root-split worker, set up once by the pool initializer
+_worker = {"engine": None, "search_id": None}
+
+
+def _init_root_worker(evaluator, settings, tt_size_mb):
+    """Pool initializer: build the engine once, it stays warm (TT, history) between jobs"""
+    from chess_engine.search import SearchEngine
+
+    _worker["engine"] = SearchEngine(evaluator, tt_size_mb=tt_size_mb, **settings)
+    _worker["search_id"] = None
+
+
+def _search_root_move(root_fen, moves, uci, depth, alpha, search_id):
+    """
+    Pool job: search one root move against the current alpha.
+    Returns (uci, score, nodes, qsearch_nodes) with the score from the root side to move's
+    point of view; a score <= alpha is only an upper bound.
+    """
+    from chess_engine.search import NULL_WINDOW
+
+    engine = _worker["engine"]
+    if search_id != _worker["search_id"]:
+        # first job of a new root search
+        engine.tt.new_search()
+        engine.clear_heuristics()
+        _worker["search_id"] = search_id
+
+    board = chess.Board(root_fen)
+    for m in moves:
+        board.push_uci(m)
+
+    engine.nodes_visited = 0
+    engine.qsearch_nodes = 0
+    engine.start_clock()
+    engine.set_root(board)
+
+    engine.make_move(board, chess.Move.from_uci(uci))
+    if alpha == -float('inf'):
+        score = -engine.negamax(board, depth - 1, -float('inf'), float('inf'))
+    else:
+        # PVS at the root: prove the move is no better than alpha, re-search if it is
+        score = -engine.negamax(board, depth - 1, -alpha - NULL_WINDOW, -alpha)
+        if score > alpha:
+            score = -engine.negamax(board, depth - 1, -float('inf'), -alpha)
+    engine.unmake_move(board)
+
+    return uci, score, engine.nodes_visited, engine.qsearch_nodes
+
+
+def get_root_pool(engine, workers):
+    """The engine's worker pool, (re)started if the number of workers changed"""
+    if engine.root_pool is not None and engine.root_pool_workers != workers:
+        engine.shutdown_pool()
+    if engine.root_pool is None:
+        engine.root_pool = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_root_worker,
+            initargs=(engine.evaluator, engine_settings(engine), engine.tt.size_mb),
+        )
+        engine.root_pool_workers = workers
+    return engine.root_pool
+
+
+def root_split_search(engine, board, depth, workers):
+    """
+    Fixed-depth root search with the root moves split over a process pool.
+    Returns (best_move, score) like SearchEngine.search_root, score from the
+    side to move's point of view.
+    """
+    engine.set_root(board)
+    key = engine.key
+
+    entry = engine.tt.probe(key)
+    tt_move = entry[3] if entry is not None else None
+    moves = engine.order_moves(board, list(board.legal_moves), tt_move, 0)
+    if not moves:
+        return None, -float('inf')
+
+    # the first (best-ordered) move is searched here with a full window to set the bound
+    best_move = moves[0]
+    engine.make_move(board, best_move)
+    best_val = -engine.negamax(board, depth - 1, -float('inf'), float('inf'))
+    engine.unmake_move(board)
+
+    if len(moves) > 1:
+        pool = get_root_pool(engine, workers)
+        root_fen = board.root().fen()
+        history = [m.uci() for m in board.move_stack]
+        engine.root_search_id += 1
+
+        # keep every worker busy, each new job gets the best score known so far
+        remaining = iter(moves[1:])
+        pending = set()
+        for move in remaining:
+            pending.add(pool.submit(_search_root_move, root_fen, history, move.uci(),
+                                    depth, best_val, engine.root_search_id))
+            if len(pending) >= workers:
+                break
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                uci, val, nodes, qsearch_nodes = future.result()
+                engine.nodes_visited += nodes
+                engine.qsearch_nodes += qsearch_nodes
+                if val > best_val:
+                    best_val = val
+                    best_move = chess.Move.from_uci(uci)
+
+                move = next(remaining, None)
+                if move is not None:
+                    pending.add(pool.submit(_search_root_move, root_fen, history, move.uci(),
+                                            depth, best_val, engine.root_search_id))
+
+    engine.tt.store(key, depth, engine.score_to_tt(best_val, 0), TT_EXACT, best_move)
+    return best_move, best_val
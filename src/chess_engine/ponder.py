@@ -0,0 +1,134 @@
+import chess
+import chess.polyglot
+import threading
+import time
+
+# Pondering: think on the opponent's time.
+# After the engine moves, the reply it expects (the best move stored in the TT
+# for the position after its own move) is played on a copy of the board and
+# searched by iterative deepening in a background thread while the opponent thinks.
+# When the real reply arrives it is either the expected one (ponder hit: the
+# search carries on, with the tables and time it already has, until it reaches
+# the requested depth) or not (ponder miss: the search is aborted and the caller
+# searches normally).
+# The thread uses the engine itself, so the engine must not be used while pondering.
+
+# safety limit for the background search, it is normally stopped long before
+MAX_PONDER_DEPTH = 64
+
+
+class Ponderer:
+    def __init__(self, engine):
+        self.engine = engine
+        self.thread = None
+        self.board = None          # position being pondered (expected reply played)
+        self.key = None            # its Zobrist key, the board itself is busy in the thread
+        self.ponder_move = None    # the expected reply
+        self.target_depth = None   # set on a ponder hit, the search stops once it gets there
+        self.result = None         # (depth, move, score) of the deepest completed iteration, white's view
+        self.start_time = 0
+
+    def expected_reply(self, board):
+        """The opponent's move the engine expects in `board`, from the TT (None if unknown)"""
+        entry = self.engine.tt.probe(chess.polyglot.zobrist_hash(board))
+        if entry is None or entry[3] is None or not board.is_legal(entry[3]):
+            return None
+        return entry[3]
+
+    def start(self, board, ponder_move=None):
+        """
+        Start pondering `board` (opponent to move) on `ponder_move`, or on the
+        expected reply if none is given. Returns the move pondered on, or None
+        when there is nothing to ponder.
+        """
+        self.stop()
+        if ponder_move is None:
+            ponder_move = self.expected_reply(board)
+        if ponder_move is None:
+            return None
+
+        self.board = board.copy()
+        self.board.push(ponder_move)
+        if self.board.is_game_over():
+            return None
+        # book moves are instant, nothing to gain
+        probe_book = getattr(self.engine, "probe_book", None)
+        if probe_book is not None and probe_book(self.board) is not None:
+            return None
+
+        self.ponder_move = ponder_move
+        self.key = chess.polyglot.zobrist_hash(self.board)
+        self.target_depth = None
+        self.result = None
+        self.start_time = time.time()
+
+        # the clock is started here, not in the thread, so a stop() right after
+        # start() can never be undone by the thread starting late
+        engine = self.engine
+        engine.nodes_visited = 0
+        engine.qsearch_nodes = 0
+        engine.start_clock()
+        engine.tt.new_search()
+        engine.clear_heuristics()
+
+        self.thread = threading.Thread(target=self._search, daemon=True)
+        self.thread.start()
+        return ponder_move
+
+    def _search(self):
+        """Iterative deepening on the pondered position, runs in the background thread"""
+        engine = self.engine
+        board = self.board
+        for depth in range(1, MAX_PONDER_DEPTH + 1):
+            engine.age_history()
+            move, score = engine.search_root(board, depth)
+            if engine.stop_search or move is None:
+                break
+            if board.turn == chess.BLACK:
+                score = -score
+            self.result = (depth, move, score)
+            if self.target_depth is not None and depth >= self.target_depth:
+                break
+
+    def is_pondering(self):
+        return self.thread is not None
+
+    def stop(self):
+        """Abort the background search (if any) and wait for the thread to finish"""
+        if self.thread is None:
+            return
+        self.engine.stop_search = True
+        self.thread.join()
+        self.thread = None
+
+    def finish(self, board, depth=None, time_limit=None):
+        """
+        Called when the opponent has moved and it is our turn in `board`.
+        On a ponder hit, keeps searching until `depth` is completed (or until
+        `time_limit` seconds have passed since the hit) and returns
+        (best_move, score, elapsed) with the score from white's point of view.
+        On a miss, or when not pondering, aborts and returns None.
+        """
+        if self.thread is None:
+            return None
+
+        hit = board.move_stack[-1:] == [self.ponder_move] and chess.polyglot.zobrist_hash(board) == self.key
+        if not hit:
+            self.stop()
+            return None
+
+        hit_time = time.time()
+        if depth is not None:
+            self.target_depth = depth
+            # the thread may have passed the target before it was set
+            if self.result is not None and self.result[0] >= depth:
+                self.engine.stop_search = True
+        if depth is not None or time_limit is not None:
+            self.thread.join(time_limit)
+        self.stop()
+
+        if self.result is None:
+            return None
+        depth_done, move, score = self.result
+        print(f"Ponder hit: {move} | Depth: {depth_done} | Pondered: {hit_time - self.start_time:.2f}s")
+        return move, score, time.time() - hit_time
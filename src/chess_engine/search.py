@@ -1,191 +1,942 @@
 import chess
+import chess.polyglot
+import math
 import time
+from array import array
+from chess_engine.transposition import TranspositionTable, pack_move, unpack_move, TT_EXACT, TT_LOWER, TT_UPPER, MATE_SCORE, EVAL_MATE_SCORE
+from chess_engine.zobrist import key_after_move
+from chess_engine.see import see
+from chess_engine.parallel import root_split_search
+
+MAX_PLY = 128
+
+# move ordering scores, TT move > winning captures/promotions > killers > history > losing captures
+TT_MOVE_SCORE = 1000000
+CAPTURE_SCORE = 100000
+KILLER_SCORE = 90000
+HISTORY_MAX = 80000
+# continuation history scores stay within +-CONT_HISTORY_MAX (gravity update, no aging needed)
+CONT_HISTORY_MAX = 8192
+CONT_HISTORY_BONUS = 16  # times depth^2 per cutoff (at most CONT_HISTORY_MAX), malus for the quiets tried before it
+# (piece, to-square) indices, colour-aware: (piece_type - 1 + 6 * colour) * 64 + square
+PIECE_TO_SIZE = 12 * 64
+# a continuation history table is a flat int32 array of [prev_piece_to][piece_to],
+# allocated once and zeroed in place from this block between searches
+CONT_HISTORY_ZEROS = bytes(4 * PIECE_TO_SIZE * PIECE_TO_SIZE)
+# the counter-move table is a uint16 array of packed moves (0 = none), [prev_piece_to]
+COUNTER_MOVE_ZEROS = bytes(2 * PIECE_TO_SIZE)
+LOSING_CAPTURE_SCORE = -CAPTURE_SCORE
+
+# aspiration windows for iterative deepening (in pawns)
+ASPIRATION_MIN_DEPTH = 4  # first depth searched inside a window around the previous score
+ASPIRATION_WINDOW = 0.25  # initial half-width, doubled on every fail
+ASPIRATION_MAX = 5.0      # beyond this the window falls back to (-inf, inf)
+
+# the clock is read about this often (in nanoseconds), the number of nodes between
+# two reads follows the measured node rate
+POLL_INTERVAL_NS = 1000000
+POLL_MAX_NODES = 4096
+
+# quiescence: a capture is skipped when stand pat + the captured piece + this
+# margin (in pawns) still cannot reach alpha (delta pruning)
+DELTA_MARGIN = 2.0
+
+# null-move pruning
+NULL_MIN_DEPTH = 3    # shallowest node where a null move is tried
+NULL_WINDOW = 0.01    # one centipawn, scores are in pawns
+
+# frontier pruning from the static eval at the last plies, margins in pawns by remaining depth
+REVERSE_FUTILITY_MARGIN = [0, 1.0, 2.0, 3.0]  # eval - margin >= beta: fail high (depth 1-3)
+RAZOR_MARGIN = [0, 2.0, 3.0, 4.0]             # eval + margin < alpha: resolve in quiescence (depth 1-3)
+FUTILITY_MARGIN = [0, 1.5, 2.5]               # eval + margin <= alpha: skip quiet moves (depth 1-2)
+FRONTIER_MAX_DEPTH = len(REVERSE_FUTILITY_MARGIN) - 1
+
+# late move reductions / late move pruning
+LMR_MIN_DEPTH = 3     # shallowest node where late quiet moves are reduced
+LMR_FULL_MOVES = 3    # moves searched at full depth before reducing
+LMP_MAX_DEPTH = 3     # deepest node where late quiet moves are skipped entirely
+# quiet moves tried before pruning the rest, by remaining depth
+LMP_MOVE_COUNT = [0] + [4 + 2 * d * d for d in range(1, LMP_MAX_DEPTH + 1)]
+
+# reduction by remaining depth and move index, grows with log(depth) * log(index)
+LMR_TABLE = [[0] * 64 for _ in range(64)]
+for d in range(1, 64):
+    for m in range(1, 64):
+        LMR_TABLE[d][m] = int(0.75 + math.log(d) * math.log(m) / 2.25)
+
+def insufficient_material(board):
+    """
+    Neither side can mate: bare kings plus at most one minor piece, or only
+    bishops that all stand on squares of one colour. Bitboard tests only.
+    """
+    if board.pawns or board.rooks or board.queens:
+        return False
+    minors = board.knights | board.bishops
+    if minors & (minors - 1) == 0:
+        return True
+    return not board.knights and (not board.bishops & chess.BB_LIGHT_SQUARES
+                                  or not board.bishops & chess.BB_DARK_SQUARES)
 
 class SearchEngine:
-    def __init__(self, evaluator):
+    def __init__(self, evaluator, tt_size_mb=16, debug_keys=False, null_move=True, null_verify=False,
+                 late_moves=True, frontier_pruning=True, qsearch_max_ply=None):
         self.evaluator = evaluator
+        # nodes_visited counts every node, qsearch_nodes the quiescence part of them
         self.nodes_visited = 0
+        self.qsearch_nodes = 0
         self.best_move = None
+        self.depth_reached = 0
+        # triangular PV table: pv_table[ply] is the best line found from that ply,
+        # built from the child's line whenever a move raises alpha
+        self.pv_table = [()] * (MAX_PLY + 1)
+        # principal variation of the last completed root search, searched first
+        # at every ply of the next one while follow_pv says the path is still on it
+        self.pv = ()
+        self.follow_pv = False
+        # root moves as [move, score, nodes] from the latest search of root_key: the
+        # score is -inf when the move failed low (only an upper bound), nodes is
+        # the size of its subtree. Iterative deepening orders the root by them.
+        self.root_key = None
+        self.root_moves = []
+
+        # running Zobrist key of the current search position, updated on every
+        # make/unmake instead of rehashing the whole board at each node
+        self.key = 0
+        self.key_stack = []
+        # keys of the game positions before the root that can still repeat (since
+        # the last irreversible move, oldest first), and the search plies of null moves
+        self.game_keys = []
+        self.null_plies = []
+        # (piece, to-square) index of every move on the search path (-1 for null
+        # moves), the context of the counter-move and continuation history tables
+        self.piece_to_stack = []
+        # running material/PST/phase totals, kept the same way when the evaluator
+        # supports it, so leaf evaluations skip the loop over all pieces
+        self.incremental_eval = hasattr(evaluator, "psqt_after_move")
+        self.psqt = None
+        self.psqt_stack = []
+        # debug mode: check the incremental key (and totals) against a full recompute after every move
+        self.debug_keys = debug_keys
+
+        # null-move pruning, optionally confirmed by a reduced-depth verification search
+        self.null_move = null_move
+        self.null_verify = null_verify
+        self.null_disabled = False
+
+        # late move reductions and late move pruning of quiet moves
+        self.late_moves = late_moves
+
+        # reverse futility pruning, razoring and futility pruning near the leaves
+        self.frontier_pruning = frontier_pruning
+
+        # optional quiescence ply limit, deeper than this only recaptures on the
+        # square of the last move are searched (None = no limit)
+        self.qsearch_max_ply = qsearch_max_ply
+
+        # time control (unused by the fixed-depth search, see SearchEngineTimed)
+        self.stop_search = False
+        self.start_time = 0
+        self.time_limit = float('inf')
+        # deadline on the perf_counter_ns clock (None = no limit), polled every
+        # poll_interval nodes with a countdown instead of a modulo at every node
+        self.deadline_ns = None
+        self.last_poll_ns = 0
+        self.poll_interval = 1
+        self.poll_countdown = 1
+        # optional multiprocessing.Event that stops the search from outside (Lazy SMP helpers)
+        self.stop_event = None
+
+        # process pool for root-split parallel search, started on first use
+        self.root_pool = None
+        self.root_pool_workers = 0
+        self.root_search_id = 0
+        # shared-memory TT of the Lazy SMP search, created on first use and kept
+        # so later SMP searches reuse what it learned
+        self.smp_tt = None
+
+        # transposition table, kept between searches so work is reused across moves
+        self.tt = TranspositionTable(tt_size_mb)
 
         # move ordering heuristics
         self.piece_values = {
-            chess.PAWN: 1, chess.KNIGHT: 3, chess.BISHOP: 3, 
+            chess.PAWN: 1, chess.KNIGHT: 3, chess.BISHOP: 3,
             chess.ROOK: 5, chess.QUEEN: 9, chess.KING: 0
         }
+        # killers: two quiet moves per ply that caused a cutoff
+        # history: butterfly table [color][from][to] flattened to one list
+        # counter_moves: the quiet move that last refuted a (piece, to) move, packed, [prev_piece_to]
+        # continuation history: [prev_piece_to][piece_to] as flat int32 arrays, for the previous move
+        # (cont_history) and the move before it (cont_history2), i.e. our own last move
+        self.killers = None
+        self.history = None
+        self.counter_moves = None
+        self.cont_history = None
+        self.cont_history2 = None
+        self.clear_heuristics()
 
-    def order_moves(self, board, moves):
+    def start_clock(self, time_limit=float('inf')):
+        """Start the search clock with a limit in seconds (inf = no limit)"""
+        self.start_time = time.time()
+        self.time_limit = time_limit
+        self.stop_search = False
+        self.last_poll_ns = time.perf_counter_ns()
+        self.deadline_ns = None if time_limit == float('inf') else self.last_poll_ns + int(time_limit * 1e9)
+        self.poll_interval = 1
+        self.poll_countdown = 1
+
+    def check_time(self):
+        """
+        Check if we've exceeded our time limit (or been told to stop), and
+        schedule the next check about POLL_INTERVAL_NS worth of nodes away
+        """
+        if self.stop_event is not None and self.stop_event.is_set():
+            self.stop_search = True
+            return True
+
+        now = time.perf_counter_ns()
+        if self.deadline_ns is not None and now >= self.deadline_ns:
+            self.stop_search = True
+            return True
+
+        # nodes searched per POLL_INTERVAL_NS at the rate since the last check
+        elapsed = now - self.last_poll_ns
+        if elapsed > 0:
+            self.poll_interval = min(max(self.poll_interval * POLL_INTERVAL_NS // elapsed, 1), POLL_MAX_NODES)
+        self.last_poll_ns = now
+        self.poll_countdown = self.poll_interval
+        return False
+
+    def set_root(self, board):
+        """Compute the key (and eval totals) of the root in full, every other node updates them"""
+        self.key = chess.polyglot.zobrist_hash(board)
+        self.key_stack = []
+        self.null_plies = []
+
+        # hash the game positions back to the last capture or pawn move once per search
+        self.game_keys = []
+        history = board.copy()
+        for _ in range(min(board.halfmove_clock, len(board.move_stack))):
+            history.pop()
+            self.game_keys.append(chess.polyglot.zobrist_hash(history))
+        self.game_keys.reverse()
+
+        # the last two game moves are the context of the first search plies
+        self.piece_to_stack = []
+        for back in (2, 1):
+            piece_to = -1
+            if len(board.move_stack) >= back:
+                move = board.move_stack[-back]
+                piece = board.piece_at(move.to_square)
+                # the piece may have been captured since
+                if move and piece is not None and piece.color == (board.turn if back == 2 else not board.turn):
+                    piece_to = (piece.piece_type - 1 + 6 * piece.color) * 64 + move.to_square
+            self.piece_to_stack.append(piece_to)
+
+        if self.incremental_eval:
+            self.psqt = self.evaluator.psqt(board)
+            self.psqt_stack = []
+
+    def make_move(self, board, move):
+        """Push a move and update the running Zobrist key and eval totals"""
+        self.key_stack.append(self.key)
+        self.key = key_after_move(board, self.key, move)
+        if not move:
+            self.null_plies.append(len(self.key_stack))
+            self.piece_to_stack.append(-1)
+        else:
+            self.piece_to_stack.append(self.piece_to(board, move))
+        if self.incremental_eval:
+            self.psqt_stack.append(self.psqt)
+            self.psqt = self.evaluator.psqt_after_move(board, self.psqt, move)
+        board.push(move)
+        if self.debug_keys:
+            assert self.key == chess.polyglot.zobrist_hash(board), \
+                f"incremental key out of sync after {move} in {board.fen()}"
+            assert not self.incremental_eval or self.psqt == self.evaluator.psqt(board), \
+                f"incremental eval totals out of sync after {move} in {board.fen()}"
+
+    def unmake_move(self, board):
+        """Pop the last move and restore the previous key and eval totals"""
+        if not board.pop():
+            self.null_plies.pop()
+        self.piece_to_stack.pop()
+        self.key = self.key_stack.pop()
+        if self.incremental_eval:
+            self.psqt = self.psqt_stack.pop()
+
+    def is_repetition(self, board):
+        """
+        Whether the current position already occurred in the game or on the search path.
+        Only positions since the last capture, pawn move or null move can come back,
+        with the same side to move, so only every second key up to there is compared.
+        """
+        key = self.key
+        ply = len(self.key_stack)
+        reach = board.halfmove_clock
+        if self.null_plies:
+            reach = min(reach, ply - self.null_plies[-1])
+
+        # a position can at the earliest repeat 4 plies later
+        for back in range(4, reach + 1, 2):
+            if back <= ply:
+                if self.key_stack[ply - back] == key:
+                    return True
+            else:
+                index = len(self.game_keys) - (back - ply)
+                if index < 0:
+                    break
+                if self.game_keys[index] == key:
+                    return True
+        return False
+
+    def order_moves(self, board, moves, tt_move=None, ply=None):
         """
         Sorts moves to improve Alpha-Beta pruning
         Order:
-        1. Captures (ordered by value difference)
+        0. Best move stored in the transposition table
+        1. Captures that do not lose material (ordered by value difference)
         2. Promotions
-        3. Quiet moves
+        3. Killer moves (quiet moves that caused a cutoff at this ply)
+        4. Quiet moves by history and continuation history score
+        5. Captures that lose material according to SEE
+        Used on full move lists (root, quiescence), interior nodes use staged_moves.
         """
+        killers = self.killers[ply] if ply is not None else ()
+
         score_moves = []
         for move in moves:
-            score = 0
-            # 1. Captures
-            if board.is_capture(move):
-                # MVV-LVA logic
-                victim_type = board.piece_type_at(move.to_square)
-                aggressor_type = board.piece_type_at(move.from_square)
-                
-                # en passant
-                if board.is_en_passant(move):
-                    victim_type = chess.PAWN
-                
-                if victim_type:
-                    score = 10 * self.piece_values[victim_type] - self.piece_values[aggressor_type]
-            
-            # 2. Promotions
-            if move.promotion:
-                score += self.piece_values[move.promotion] * 10 # to match the capture scale
+            # 0. TT move
+            if move == tt_move:
+                score = TT_MOVE_SCORE
+
+            # 1. Captures and 2. Promotions
+            elif move.promotion or board.is_capture(move):
+                score = self.capture_score(board, move)
+
+            # 3. Killer moves
+            elif move in killers:
+                score = KILLER_SCORE if move == killers[0] else KILLER_SCORE - 1
+
+            # 4. Quiet moves, kept below the killers
+            else:
+                score = min(self.quiet_score(board, move), KILLER_SCORE - 2)
 
             score_moves.append((score, move))
 
         # sort moves descending by score
         score_moves.sort(key=lambda x: x[0], reverse=True)
         return [move for score, move in score_moves]
-    
 
-    def quiescence(self, board, alpha, beta):
+    def piece_to(self, board, move):
+        """(piece, to-square) index of a move, for the counter-move and continuation tables"""
+        return (board.piece_type_at(move.from_square) - 1 + 6 * board.turn) * 64 + move.to_square
+
+    def quiet_score(self, board, move):
+        """Ordering score of a quiet move: history plus continuation history for the last two plies"""
+        score = self.history[int(board.turn) * 4096 + move.from_square * 64 + move.to_square]
+        prev = self.piece_to_stack[-1] if self.piece_to_stack else -1
+        prev2 = self.piece_to_stack[-2] if len(self.piece_to_stack) >= 2 else -1
+        if prev >= 0 or prev2 >= 0:
+            piece_to = self.piece_to(board, move)
+            if prev >= 0:
+                score += self.cont_history[prev * PIECE_TO_SIZE + piece_to]
+            if prev2 >= 0:
+                score += self.cont_history2[prev2 * PIECE_TO_SIZE + piece_to]
+        return score
+
+    def capture_score(self, board, move):
+        """
+        MVV-LVA ordering score of a capture and/or promotion.
+        Captures that lose material in the exchange (SEE < 0) get a negative score.
+        """
+        victim_type = board.piece_type_at(move.to_square)
+        aggressor_type = board.piece_type_at(move.from_square)
+        if not victim_type and board.is_en_passant(move):
+            victim_type = chess.PAWN
+
+        score = CAPTURE_SCORE
+        if victim_type:
+            score += 10 * self.piece_values[victim_type] - self.piece_values[aggressor_type]
+        if move.promotion:
+            score += self.piece_values[move.promotion] * 10 # to match the capture scale
+
+        # taking a piece worth at least the capturer can never lose material
+        if (not victim_type or self.piece_values[victim_type] < self.piece_values[aggressor_type]) \
+                and see(board, move) < 0:
+            score += LOSING_CAPTURE_SCORE - CAPTURE_SCORE
+        return score
+
+    def staged_moves(self, board, tt_move, ply):
+        """
+        Lazy move picker for the interior nodes, yields moves in stages:
+        1. TT move (before anything is generated)
+        2. Captures and promotions that do not lose material, MVV-LVA
+        3. Killer moves and the counter move to the opponent's last move
+        4. Quiet moves by history and continuation history score
+        5. Losing captures (SEE < 0)
+        Every stage is only generated once the previous ones failed to cut off,
+        and most cut nodes never get past the first move or two.
+        """
+        # 1. TT move, which may come from a colliding position so check it first
+        if tt_move is not None and board.is_legal(tt_move):
+            yield tt_move
+        else:
+            tt_move = None
+
+        # 2. captures (en passant included) and quiet promotions
+        tactical = list(board.generate_legal_captures())
+        tactical.extend(board.generate_legal_moves(board.pawns, chess.BB_BACKRANKS & ~board.occupied))
+        scored = [(self.capture_score(board, move), move) for move in tactical if move != tt_move]
+        scored.sort(key=lambda x: x[0], reverse=True)
+        losing = []
+        for score, move in scored:
+            if score < 0:
+                losing.append(move)
+            else:
+                yield move
+
+        # 3. killers and the counter move, which only need to be legal and quiet here
+        refutations = [killer for killer in self.killers[ply] if killer is not None]
+        prev = self.piece_to_stack[-1] if self.piece_to_stack else -1
+        counter = self.counter_moves[prev] if prev >= 0 else 0
+        if counter:
+            refutations.append(unpack_move(counter))
+        killers = []
+        for move in refutations:
+            if (move != tt_move and move not in killers and not move.promotion
+                    and board.is_legal(move) and not board.is_capture(move)):
+                killers.append(move)
+        for killer in killers:
+            yield killer
+
+        # 4. quiet moves
+        quiets = []
+        # python-chess generates castling as king takes own rook, so own squares stay in the mask
+        for move in board.generate_legal_moves(chess.BB_ALL, ~board.occupied_co[not board.turn]):
+            if move.promotion or move == tt_move or move in killers or board.is_en_passant(move):
+                continue
+            quiets.append((self.quiet_score(board, move), move))
+        quiets.sort(key=lambda x: x[0], reverse=True)
+        for score, move in quiets:
+            yield move
+
+        # 5. captures that lose material, still sorted by MVV-LVA
+        for move in losing:
+            yield move
+
+    def update_quiet_cutoff(self, board, move, depth, ply, tried=()):
+        """
+        Record a quiet move that caused a beta cutoff in the killer, history,
+        counter-move and continuation history tables. The quiet moves in `tried`
+        were searched before it without a cutoff and lose continuation history.
+        """
+        killers = self.killers[ply]
+        if move != killers[0]:
+            killers[1] = killers[0]
+            killers[0] = move
+
+        idx = int(board.turn) * 4096 + move.from_square * 64 + move.to_square
+        self.history[idx] += depth * depth
+        # keep history scores below the killer scores
+        if self.history[idx] >= HISTORY_MAX:
+            self.age_history()
+
+        prev = self.piece_to_stack[-1] if self.piece_to_stack else -1
+        prev2 = self.piece_to_stack[-2] if len(self.piece_to_stack) >= 2 else -1
+        if prev >= 0:
+            self.counter_moves[prev] = pack_move(move)
+        # past that the gravity update would overshoot
+        bonus = min(CONT_HISTORY_BONUS * depth * depth, CONT_HISTORY_MAX)
+        for table, context in ((self.cont_history, prev), (self.cont_history2, prev2)):
+            if context < 0:
+                continue
+            base = context * PIECE_TO_SIZE
+            for quiet in tried:
+                self.update_cont_history(table, base + self.piece_to(board, quiet), -bonus)
+            self.update_cont_history(table, base + self.piece_to(board, move), bonus)
+
+    def update_cont_history(self, table, idx, bonus):
+        """Gravity update: entries move towards +-CONT_HISTORY_MAX and never pass it"""
+        table[idx] += bonus - int(table[idx] * abs(bonus) / CONT_HISTORY_MAX)
+
+    def age_history(self):
+        """Halve all history scores so older cutoffs count less than recent ones"""
+        self.history = [h // 2 for h in self.history]
+
+    def can_null_move(self, board, depth):
+        """Whether passing the turn is a safe way to prune this node"""
+        if not self.null_move or self.null_disabled or depth < NULL_MIN_DEPTH:
+            return False
+        # passing while in check is illegal
+        if board.is_check():
+            return False
+        # never two null moves in a row
+        if board.move_stack and not board.move_stack[-1]:
+            return False
+        # zugzwang is common when the side to move only has pawns left
+        if not board.occupied_co[board.turn] & ~(board.pawns | board.kings):
+            return False
+        return True
+
+    def late_move_reduction(self, board, move, depth, index, in_check, killers):
+        """
+        How much to reduce a move that comes late in the ordering.
+        Returns 0 to search it at full depth, a positive reduction, or None when
+        the move can be skipped altogether (late move pruning near the leaves).
+        Only quiet, non-checking moves are touched.
+        """
+        if not self.late_moves or index < LMR_FULL_MOVES or in_check:
+            return 0
+        if board.is_capture(move) or move.promotion or move in killers:
+            return 0
+        if board.gives_check(move):
+            return 0
+
+        if depth <= LMP_MAX_DEPTH and index >= LMP_MOVE_COUNT[depth]:
+            return None
+        if depth >= LMR_MIN_DEPTH:
+            # always leave at least one ply for the reduced search
+            return min(LMR_TABLE[min(depth, 63)][min(index, 63)], depth - 2)
+        return 0
+
+    def clear_heuristics(self):
+        """Reset killers, history tables and the previous PV before a new search"""
+        self.killers = [[None, None] for _ in range(MAX_PLY)]
+        self.history = [0] * (2 * 64 * 64)
+        if self.cont_history is None:
+            self.counter_moves = array('H', COUNTER_MOVE_ZEROS)
+            self.cont_history = array('i', CONT_HISTORY_ZEROS)
+            self.cont_history2 = array('i', CONT_HISTORY_ZEROS)
+        else:
+            memoryview(self.counter_moves).cast('B')[:] = COUNTER_MOVE_ZEROS
+            memoryview(self.cont_history).cast('B')[:] = CONT_HISTORY_ZEROS
+            memoryview(self.cont_history2).cast('B')[:] = CONT_HISTORY_ZEROS
+        self.pv = ()
+        self.root_key = None
+        self.root_moves = []
+
+
+    def score_to_tt(self, score, ply):
+        """Mate scores are stored relative to the node, not the root"""
+        if score >= MATE_SCORE:
+            return score + ply
+        if score <= -MATE_SCORE:
+            return score - ply
+        return score
+
+    def score_from_tt(self, score, ply):
+        """Inverse of score_to_tt"""
+        if score >= MATE_SCORE:
+            return score - ply
+        if score <= -MATE_SCORE:
+            return score + ply
+        return score
+
+    def quiescence(self, board, alpha, beta, qply=0):
         """
         Quiescence search to avoid horizon effect.
         Helps to make better trade decisions in volatile positions.
+        Negamax: scores are from the side to move's point of view.
+        qply counts the plies since the main search ended.
         """
+        if self.stop_search:
+            return 0
+
         self.nodes_visited += 1
-        
-        # stand pat (static evaluation)
-        stand_pat = self.evaluator.evaluate(board)
-
-        # pruning based on turn
-        if board.turn == chess.WHITE:
-            # white maxiising 
-            if stand_pat >= beta:
-                return beta
-            if stand_pat > alpha:
-                alpha = stand_pat
-        else:
-            # black minimising
-            if stand_pat <= alpha:
-                return alpha
-            if stand_pat < beta:
-                beta = stand_pat
+        self.qsearch_nodes += 1
 
-        # check captures
-        moves = self.order_moves(board, [m for m in board.legal_moves if board.is_capture(m)])
+        # Periodically check time (about once per millisecond)
+        self.poll_countdown -= 1
+        if self.poll_countdown <= 0 and self.check_time():
+            return 0
 
-        for move in moves:
-            board.push(move)
-            score = self.quiescence(board, alpha, beta)
-            board.pop()
+        # only positions in check can be mate here, a stalemate is just evaluated
+        if board.is_check() and not any(board.generate_legal_moves()):
+            return -(MATE_SCORE + MAX_PLY - len(self.key_stack))
 
-            if board.turn == chess.WHITE:
-                if score >= beta: return beta
-                if score > alpha: alpha = score
-            else:
-                if score <= alpha: return alpha
-                if score < beta: beta = score
+        # stand pat (static evaluation, the evaluator scores from white's side)
+        stand_pat = self.evaluator.evaluate(board, self.key, self.psqt, terminal_checks=False)
+        if board.turn == chess.BLACK:
+            stand_pat = -stand_pat
 
-        if board.turn == chess.WHITE:
-            return alpha
-        else:
+        if stand_pat >= beta:
             return beta
+        if stand_pat > alpha:
+            alpha = stand_pat
+
+        # past the ply limit only recaptures on the last move's square are left
+        to_mask = chess.BB_ALL
+        if self.qsearch_max_ply is not None and qply >= self.qsearch_max_ply and board.move_stack:
+            to_mask = chess.BB_SQUARES[board.peek().to_square]
+
+        # check captures, skipping those that lose material in the exchange
+        captures = []
+        for move in board.generate_legal_captures(chess.BB_ALL, to_mask):
+            # delta pruning: even winning the victim for free would not raise alpha
+            victim_type = board.piece_type_at(move.to_square) or chess.PAWN  # empty: en passant
+            gain = self.piece_values[victim_type]
+            if move.promotion:
+                gain += self.piece_values[move.promotion] - self.piece_values[chess.PAWN]
+            if stand_pat + gain + DELTA_MARGIN <= alpha:
+                continue
+
+            score = self.capture_score(board, move)
+            if score >= 0:
+                captures.append((score, move))
+        captures.sort(key=lambda x: x[0], reverse=True)
+
+        for score, move in captures:
+            if self.stop_search:
+                break
+
+            self.make_move(board, move)
+            score = -self.quiescence(board, -beta, -alpha, qply + 1)
+            self.unmake_move(board)
+            # an interrupted child's score means nothing, unwind
+            if self.stop_search:
+                return 0
+
+            if score >= beta:
+                return beta
+            if score > alpha:
+                alpha = score
+
+        return alpha
+
+    def negamax(self, board, depth, alpha, beta):
+        """
+        Principal variation search (negamax form).
+        The first move is searched with the full window, the rest with a null
+        window and only re-searched when they turn out to beat alpha.
+        Scores are from the side to move's point of view.
+        """
+        if self.stop_search:
+            return 0
 
-    def minimax(self, board, depth, alpha, beta):
         self.nodes_visited += 1
 
+        # Periodically check time (about once per millisecond)
+        self.poll_countdown -= 1
+        if self.poll_countdown <= 0 and self.check_time():
+            return 0
+
+        ply = len(self.key_stack)
+        self.pv_table[ply] = ()
+
         # termination condition
-        if depth == 0:
+        if depth <= 0:
             return self.quiescence(board, alpha, beta)
-        
-        if board.is_checkmate():
-            # if white is mated, score is -infinity. If black is mated, score is +infinity.
-            # we add 'depth' to prefer faster mates.
-            if board.turn == chess.WHITE:
-                return -99999 - depth # White lost
-            else:
-                return 99999 + depth  # Black lost
-                
-        if board.is_stalemate() or board.is_insufficient_material():
+
+        # mate and stalemate show up as an empty move list below
+        if insufficient_material(board):
             return 0
 
         # Repetition detection: if the current position has already occurred
         # in the game history, treat it as a draw. This prevents the engine
         # from repeating moves and throwing away winning positions.
-        if board.is_repetition(2):
+        if self.is_repetition(board):
             return 0
 
-        # move Generation
-        moves = self.order_moves(board, list(board.legal_moves))
-
-        # white maximising
-        if board.turn == chess.WHITE:
-            max_eval = -float('inf')
-            for move in moves:
-                board.push(move)
-                eval_score = self.minimax(board, depth - 1, alpha, beta)
-                board.pop()
-                
-                max_eval = max(max_eval, eval_score)
-                alpha = max(alpha, eval_score)
-                
-                # beta cutoff
-                if beta <= alpha:
-                    break
-            return max_eval
+        # null-window nodes are where almost all the pruning happens. The scout
+        # window (-alpha - NULL_WINDOW, -alpha) comes out a hair wider than
+        # NULL_WINDOW in floating point, so compare with some slack
+        pv_node = beta - alpha > 1.5 * NULL_WINDOW
+
+        # Transposition table probe: reuse the result of an earlier search of
+        # this position if it went at least as deep, otherwise just take its move.
+        # PV nodes are always searched so the principal variation comes out whole
+        key = self.key
+        tt_move = None
+        entry = self.tt.probe(key)
+        if entry is not None:
+            tt_depth, tt_score, tt_flag, tt_move = entry
+            if tt_depth >= depth and not pv_node:
+                tt_score = self.score_from_tt(tt_score, ply)
+                if tt_flag == TT_EXACT:
+                    return tt_score
+                elif tt_flag == TT_LOWER:
+                    alpha = max(alpha, tt_score)
+                elif tt_flag == TT_UPPER:
+                    beta = min(beta, tt_score)
+                if alpha >= beta:
+                    return tt_score
+
+        # on the previous PV its next move is tried first, whatever the TT says
+        on_pv = self.follow_pv
+        pv_move = self.pv[ply] if on_pv and ply < len(self.pv) else None
+        if pv_move is not None:
+            tt_move = pv_move
+        self.follow_pv = False
 
-        # black minimising
+        in_check = board.is_check()
+
+        # Frontier pruning: close to the leaves the static eval decides whether a
+        # node is worth expanding. Never in check (the eval means nothing there)
+        # and never near mate scores, where a margin in pawns proves nothing.
+        futile = False
+        if (self.frontier_pruning and not pv_node and not in_check and depth <= FRONTIER_MAX_DEPTH
+                and abs(alpha) < EVAL_MATE_SCORE and abs(beta) < EVAL_MATE_SCORE):
+            static_eval = self.evaluator.evaluate(board, key, self.psqt, terminal_checks=False)
+            if board.turn == chess.BLACK:
+                static_eval = -static_eval
+
+            # reverse futility: so far above beta that the opponent cannot catch up
+            if static_eval - REVERSE_FUTILITY_MARGIN[depth] >= beta:
+                return static_eval
+
+            # razoring: so far below alpha that only captures could help, let quiescence decide.
+            # Quiescence does not see quiet checks, so a side that can check (maybe mate) is searched
+            if static_eval + RAZOR_MARGIN[depth] < alpha and not any(
+                    board.gives_check(move) for move in board.generate_legal_moves()):
+                if depth == 1:
+                    return self.quiescence(board, alpha, beta)
+                score = self.quiescence(board, alpha, alpha + NULL_WINDOW)
+                if self.stop_search:
+                    return 0
+                if score <= alpha:
+                    return score
+
+            # futility: quiet moves cannot raise the eval enough, only try the others
+            futile = depth < len(FUTILITY_MARGIN) and static_eval + FUTILITY_MARGIN[depth] <= alpha
+
+        # Null-move pruning: give the opponent a free move. If a reduced search still
+        # fails high, a real move would too, so prune the subtree.
+        # Mate scores found after passing the turn mean nothing.
+        if not pv_node and abs(beta) < EVAL_MATE_SCORE and self.can_null_move(board, depth):
+            R = 3 if depth >= 6 else 2
+
+            self.make_move(board, chess.Move.null())
+            score = -self.negamax(board, depth - 1 - R, -beta, -beta + NULL_WINDOW)
+            self.unmake_move(board)
+            if self.stop_search:
+                return 0
+
+            if score >= beta and self.null_verify:
+                # verification: a reduced normal search must agree before we prune
+                self.null_disabled = True
+                score = self.negamax(board, depth - R, beta - NULL_WINDOW, beta)
+                self.null_disabled = False
+                if self.stop_search:
+                    return 0
+
+            if score >= beta:
+                return beta
+
+        # window the result is measured against, used to pick the bound type
+        alpha_orig = alpha
+        best_move = None
+        best_eval = -float('inf')
+
+        # moves are generated stage by stage, quiets only when nothing cut off before them
+        killers = self.killers[ply]
+
+        has_moves = False
+        quiets_tried = []
+        for i, move in enumerate(self.staged_moves(board, tt_move, ply)):
+            has_moves = True
+
+            # futility pruning: the first move is always searched so there is a score to return
+            if (futile and i > 0 and abs(best_eval) < EVAL_MATE_SCORE
+                    and not board.is_capture(move) and not move.promotion and not board.gives_check(move)):
+                continue
+
+            reduction = self.late_move_reduction(board, move, depth, i, in_check, killers)
+            if reduction is None:
+                # late move pruning, as long as we are not being mated
+                if abs(best_eval) < EVAL_MATE_SCORE:
+                    continue
+                reduction = 0
+
+            # only the PV move leads further down the previous PV
+            self.follow_pv = on_pv and move == pv_move
+            self.make_move(board, move)
+            if i == 0:
+                eval_score = -self.negamax(board, depth - 1, -beta, -alpha)
+            else:
+                # null window (and maybe reduced depth): just prove the move is no better
+                eval_score = -self.negamax(board, depth - 1 - reduction, -alpha - NULL_WINDOW, -alpha)
+                if eval_score > alpha and reduction and not self.stop_search:
+                    eval_score = -self.negamax(board, depth - 1, -alpha - NULL_WINDOW, -alpha)
+                # it is better: get its exact score with the full window
+                if alpha < eval_score < beta and not self.stop_search:
+                    eval_score = -self.negamax(board, depth - 1, -beta, -alpha)
+            self.unmake_move(board)
+            # the interrupted child returned 0, which must not reach best_eval, alpha or the TT
+            if self.stop_search:
+                return 0
+
+            if eval_score > best_eval:
+                best_eval = eval_score
+                best_move = move
+            if eval_score > alpha:
+                alpha = eval_score
+                if pv_node:
+                    self.pv_table[ply] = (move,) + self.pv_table[ply + 1]
+
+            quiet = not board.is_capture(move) and not move.promotion
+            # beta cutoff
+            if alpha >= beta:
+                if quiet:
+                    self.update_quiet_cutoff(board, move, depth, ply, quiets_tried)
+                break
+            if quiet:
+                quiets_tried.append(move)
+
+        if not has_moves:
+            # side to move is mated (faster mates score higher) or stalemated
+            return -(MATE_SCORE + MAX_PLY - ply) if in_check else 0
+
+        # store the result (an interrupted search has already returned)
+        if best_eval <= alpha_orig:
+            flag = TT_UPPER
+        elif best_eval >= beta:
+            flag = TT_LOWER
         else:
-            min_eval = float('inf')
-            for move in moves:
-                board.push(move)
-                eval_score = self.minimax(board, depth - 1, alpha, beta)
-                board.pop()
-                
-                min_eval = min(min_eval, eval_score)
-                beta = min(beta, eval_score)
-                
-                # alpha cutoff
-                if beta <= alpha:
-                    break
-            return min_eval
+            flag = TT_EXACT
+        self.tt.store(key, depth, self.score_to_tt(best_eval, ply), flag, best_move)
+
+        return best_eval
+
+    def search_root(self, board, depth, alpha=-float('inf'), beta=float('inf'), excluded=()):
+        """
+        Search the root to a specific depth inside the (alpha, beta) window.
+        Returns (best_move, score) with the score from the side to move's point
+        of view. A score <= alpha or >= beta is only a bound (aspiration fail).
+        Root moves in `excluded` are skipped (MultiPV: the lines already found),
+        such a search leaves the TT entry of the root alone.
+
+        When the search is stopped part way, only a move that was searched to
+        the end and beat the first move (the previous best) is returned,
+        otherwise (None, -inf): the caller keeps its last completed iteration.
+        """
+        # the root key is hashed in full once, every other node updates it incrementally
+        self.set_root(board)
+        key = self.key
+
+        # searching the root from the previous PV (or else the TT move) lets
+        # iterative deepening reuse its best line
+        entry = self.tt.probe(key)
+        tt_move = entry[3] if entry is not None else None
+        pv_move = self.pv[0] if self.pv else None
+        if pv_move is not None:
+            tt_move = pv_move
+        self.pv_table[0] = ()
+
+        if key != self.root_key:
+            self.root_key = key
+            self.root_moves = [[move, -float('inf'), 0]
+                               for move in self.order_moves(board, list(board.legal_moves), tt_move, 0)]
+        else:
+            # the previous best first, then the moves that raised alpha by score,
+            # then the rest by subtree size (hard to refute moves took more nodes)
+            self.root_moves.sort(key=lambda rm: (rm[0] == tt_move, rm[1], rm[2]), reverse=True)
+
+        root_moves = self.root_moves
+        if excluded:
+            root_moves = [rm for rm in root_moves if rm[0] not in excluded]
+
+        alpha_orig = alpha
+        best_move = None
+        best_val = -float('inf')
+        # the last move that raised alpha: a proven improvement on the moves before it
+        raised = None
+
+        for i, root_move in enumerate(root_moves):
+            if self.stop_search:
+                break
+
+            move = root_move[0]
+            nodes_before = self.nodes_visited
+            self.follow_pv = move == pv_move
+            self.make_move(board, move)
+            if i == 0:
+                val = -self.negamax(board, depth - 1, -beta, -alpha)
+            else:
+                val = -self.negamax(board, depth - 1, -alpha - NULL_WINDOW, -alpha)
+                if alpha < val < beta and not self.stop_search:
+                    val = -self.negamax(board, depth - 1, -beta, -alpha)
+            self.unmake_move(board)
+            # only fully searched moves count, the interrupted one scored a meaningless 0
+            if self.stop_search:
+                break
+
+            root_move[1] = val if val > alpha else -float('inf')
+            root_move[2] = self.nodes_visited - nodes_before
+            if val > best_val:
+                best_val = val
+                best_move = move
+            if val > alpha:
+                alpha = val
+                raised = move
+                self.pv_table[0] = (move,) + self.pv_table[1]
+            if alpha >= beta:
+                break
+        self.follow_pv = False
+
+        if self.stop_search:
+            if raised is None or raised == root_moves[0][0]:
+                return None, -float('inf')
+            self.pv = self.pv_table[0]
+            return raised, best_val
+
+        if best_move is not None:
+            if best_val <= alpha_orig:
+                flag = TT_UPPER
+            elif best_val >= beta:
+                flag = TT_LOWER
+            else:
+                flag = TT_EXACT
+                # only an exact score comes with a complete line
+                self.pv = self.pv_table[0]
+            # the best of a subset of the root moves is not the root's result
+            if not excluded:
+                self.tt.store(key, depth, self.score_to_tt(best_val, 0), flag, best_move)
 
-    def get_best_move(self, board, depth=3):
+        return best_move, best_val
+
+    def search_depth(self, board, depth):
+        """Search to a specific depth and return best move and score (from white's point of view)"""
+        # older history scores count for less in each new iteration
+        self.age_history()
+
+        best_move, best_val = self.search_root(board, depth)
+        if board.turn == chess.BLACK:
+            best_val = -best_val
+        return best_move, best_val
+
+    def shutdown_pool(self):
+        """Stop the root-split worker processes and free the Lazy SMP shared table"""
+        if self.root_pool is not None:
+            self.root_pool.shutdown()
+            self.root_pool = None
+            self.root_pool_workers = 0
+        if self.smp_tt is not None:
+            self.smp_tt.close()
+            self.smp_tt = None
+
+    def get_best_move(self, board, depth=3, workers=1):
+        """
+        Fixed-depth search. Returns (best_move, score, elapsed), score from white's point of view.
+        With workers > 1 the root moves after the first are searched in parallel
+        by a pool of worker processes (kept alive until shutdown_pool()).
+        """
         self.nodes_visited = 0
+        self.qsearch_nodes = 0
         self.best_move = None
-        start_time = time.time()
-        
-        alpha = -float('inf')
-        beta = float('inf')
-        
-        moves = self.order_moves(board, list(board.legal_moves))
-        
-        if board.turn == chess.WHITE:
-            best_val = -float('inf')
-            for move in moves:
-                board.push(move)
-                val = self.minimax(board, depth - 1, alpha, beta)
-                board.pop()
-                
-                if val > best_val:
-                    best_val = val
-                    self.best_move = move
-                alpha = max(alpha, best_val)
+        self.start_clock()
+        self.tt.new_search()
+        self.clear_heuristics()
+
+        if workers > 1:
+            self.age_history()
+            self.best_move, best_val = root_split_search(self, board, depth, workers)
+            if board.turn == chess.BLACK:
+                best_val = -best_val
         else:
-            best_val = float('inf')
-            for move in moves:
-                board.push(move)
-                val = self.minimax(board, depth - 1, alpha, beta)
-                board.pop()
-                
-                if val < best_val:
-                    best_val = val
-                    self.best_move = move
-                beta = min(beta, best_val)
-
-        elapsed = time.time() - start_time
+            self.best_move, best_val = self.search_depth(board, depth)
+
+        elapsed = time.time() - self.start_time
         # print(f"Depth: {depth} | Nodes: {self.nodes_visited} | Time: {elapsed:.3f}s")
         # print(f"Best Move: {self.best_move} | Score: {best_val:.2f}")
-        
-        return self.best_move, best_val, elapsed
\ No newline at end of file
+
+        return self.best_move, best_val, elapsed
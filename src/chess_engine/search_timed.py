@@ -1,275 +1,199 @@
 import chess
 import time
+from chess_engine.parallel import lazy_smp_search
+from chess_engine.search import SearchEngine, ASPIRATION_MIN_DEPTH, ASPIRATION_WINDOW, ASPIRATION_MAX
+from chess_engine.timeman import TimeManager
+from chess_engine.transposition import EVAL_MATE_SCORE
 
 """Search engine that uses a time limit instead of depth limit."""
-class SearchEngineTimed:
-    def __init__(self, evaluator):
-        self.evaluator = evaluator
-        self.nodes_visited = 0
-        self.best_move = None
-        self.stop_search = False
-        self.start_time = 0
-        self.time_limit = 0
-
-        # move ordering heuristics
-        self.piece_values = {
-            chess.PAWN: 1, chess.KNIGHT: 3, chess.BISHOP: 3, 
-            chess.ROOK: 5, chess.QUEEN: 9, chess.KING: 0
-        }    
-
-
-    def check_time(self):
-        """Check if we've exceeded our time limit"""
-        if time.time() - self.start_time >= self.time_limit:
-            self.stop_search = True
-            return True
-        return False
-    
-    def order_moves(self, board, moves):
+class SearchEngineTimed(SearchEngine):
+    def search_aspiration(self, board, depth, prev_score, excluded=()):
         """
-        Sorts moves to improve Alpha-Beta pruning
-        Order:
-        1. Captures (ordered by value difference)
-        2. Promotions
-        3. Quiet moves
+        Search the root inside a narrow window around the previous iteration's
+        score (side to move's point of view), widening it on fail-high / fail-low.
+        Root moves in `excluded` are not searched.
         """
-        score_moves = []
-        for move in moves:
-            score = 0
-            # 1. Captures
-            if board.is_capture(move):
-                # MVV-LVA logic
-                victim_type = board.piece_type_at(move.to_square)
-                aggressor_type = board.piece_type_at(move.from_square)
-                
-                # en passant
-                if board.is_en_passant(move):
-                    victim_type = chess.PAWN
-                
-                if victim_type:
-                    score = 10 * self.piece_values[victim_type] - self.piece_values[aggressor_type]
-            
-            # 2. Promotions
-            if move.promotion:
-                score += self.piece_values[move.promotion] * 10 # to match the capture scale
-
-            score_moves.append((score, move))
-
-        # sort moves descending by score
-        score_moves.sort(key=lambda x: x[0], reverse=True)
-        return [move for score, move in score_moves]
-    
-
-    def quiescence(self, board, alpha, beta):
+        if depth < ASPIRATION_MIN_DEPTH or prev_score is None or abs(prev_score) >= EVAL_MATE_SCORE:
+            return self.search_root(board, depth, excluded=excluded)
+
+        delta = ASPIRATION_WINDOW
+        alpha = prev_score - delta
+        beta = prev_score + delta
+        while True:
+            move, score = self.search_root(board, depth, alpha, beta, excluded)
+            if self.stop_search:
+                return move, score
+
+            if score <= alpha:
+                alpha = score - delta
+            elif score >= beta:
+                beta = score + delta
+            else:
+                return move, score
+
+            # window too wide to be worth it any more, search the rest in full
+            delta *= 2
+            if delta > ASPIRATION_MAX:
+                return self.search_root(board, depth, excluded=excluded)
+
+    def search_multipv(self, board, timer, max_depth, multipv):
         """
-        Quiescence search to avoid horizon effect.
-        Helps to make better trade decisions in volatile positions.
+        Iterative deepening for the best `multipv` root moves. Every iteration
+        searches the root once per line, each time without the moves of the
+        lines found before it, all on the same tables. Each line follows its
+        own PV from the previous iteration.
+        Returns the lines ranked best first as (move, score, pv, depth) with
+        the score from white's point of view.
         """
-        if self.stop_search:
-            return 0
-        
-        self.nodes_visited += 1
-        
-        # Periodically check time (every 2048 nodes to avoid overhead)
-        if self.nodes_visited % 2048 == 0:
-            self.check_time()
-        
-        # stand pat (static evaluation)
-        stand_pat = self.evaluator.evaluate(board)
-
-        # pruning based on turn
-        if board.turn == chess.WHITE:
-            # white maxiising 
-            if stand_pat >= beta:
-                return beta
-            if stand_pat > alpha:
-                alpha = stand_pat
-        else:
-            # black minimising
-            if stand_pat <= alpha:
-                return alpha
-            if stand_pat < beta:
-                beta = stand_pat
-
-        # check captures
-        moves = self.order_moves(board, [m for m in board.legal_moves if board.is_capture(m)])
-
-        for move in moves:
+        lines = []
+        for depth in range(1, max_depth + 1):
             if self.stop_search:
                 break
-                
-            board.push(move)
-            score = self.quiescence(board, alpha, beta)
-            board.pop()
-
-            if board.turn == chess.WHITE:
-                if score >= beta: return beta
-                if score > alpha: alpha = score
-            else:
-                if score <= alpha: return alpha
-                if score < beta: beta = score
-
-        if board.turn == chess.WHITE:
-            return alpha
-        else:
-            return beta
-
-    def minimax(self, board, depth, alpha, beta):
-        if self.stop_search:
-            return 0
-        
-        self.nodes_visited += 1
-        
-        # Periodically check time (every 2048 nodes to avoid overhead)
-        if self.nodes_visited % 2048 == 0:
-            self.check_time()
-
-        # termination condition
-        if depth == 0:
-            return self.quiescence(board, alpha, beta)
-        
-        if board.is_checkmate():
-            # if white is mated, score is -infinity. If black is mated, score is +infinity.
-            # we add 'depth' to prefer faster mates.
-            if board.turn == chess.WHITE:
-                return -99999 - depth # White lost
-            else:
-                return 99999 + depth  # Black lost
-                
-        if board.is_stalemate() or board.is_insufficient_material():
-            return 0
-
-        # Repetition detection: if the current position has already occurred
-        # in the game history, treat it as a draw. This prevents the engine
-        # from repeating moves and throwing away winning positions.
-        if board.is_repetition(2):
-            return 0
-
-        # move Generation
-        moves = self.order_moves(board, list(board.legal_moves))
-
-        # white maximising
-        if board.turn == chess.WHITE:
-            max_eval = -float('inf')
-            for move in moves:
-                if self.stop_search:
+            self.age_history()
+
+            new_lines = []
+            excluded = []
+            for k in range(multipv):
+                prev = lines[k] if k < len(lines) else None
+                self.pv = prev[2] if prev is not None else ()
+                prev_score = None
+                if prev is not None:
+                    prev_score = -prev[1] if board.turn == chess.BLACK else prev[1]
+
+                move, score = self.search_aspiration(board, depth, prev_score, excluded)
+                # a line cut short is not used, nor the ones after it
+                if self.stop_search or move is None:
                     break
-                    
-                board.push(move)
-                eval_score = self.minimax(board, depth - 1, alpha, beta)
-                board.pop()
-                
-                max_eval = max(max_eval, eval_score)
-                alpha = max(alpha, eval_score)
-                
-                # beta cutoff
-                if beta <= alpha:
-                    break
-            return max_eval
+                if k == 0:
+                    timer.update(move, score)
+                if board.turn == chess.BLACK:
+                    score = -score
+                # the PV is only replaced by exact results, a bound leaves just the move
+                pv = self.pv if self.pv[:1] == (move,) else (move,)
+                new_lines.append((move, score, pv, depth))
+                excluded.append(move)
+
+            if new_lines:
+                # lines of the previous depth fill in where this one was interrupted
+                found = [line[0] for line in new_lines]
+                lines = new_lines + [line for line in lines if line[0] not in found][:multipv - len(new_lines)]
 
-        # black minimising
-        else:
-            min_eval = float('inf')
-            for move in moves:
-                if self.stop_search:
-                    break
-                    
-                board.push(move)
-                eval_score = self.minimax(board, depth - 1, alpha, beta)
-                board.pop()
-                
-                min_eval = min(min_eval, eval_score)
-                beta = min(beta, eval_score)
-                
-                # alpha cutoff
-                if beta <= alpha:
-                    break
-            return min_eval
-
-    def search_depth(self, board, depth):
-        """Search to a specific depth and return best move and score"""
-        alpha = -float('inf')
-        beta = float('inf')
-        
-        moves = self.order_moves(board, list(board.legal_moves))
-        best_move = None
-        
-        if board.turn == chess.WHITE:
-            best_val = -float('inf')
-            for move in moves:
-                if self.stop_search:
-                    break
-                    
-                board.push(move)
-                val = self.minimax(board, depth - 1, alpha, beta)
-                board.pop()
-                
-                if val > best_val:
-                    best_val = val
-                    best_move = move
-                alpha = max(alpha, best_val)
-        else:
-            best_val = float('inf')
-            for move in moves:
-                if self.stop_search:
-                    break
-                    
-                board.push(move)
-                val = self.minimax(board, depth - 1, alpha, beta)
-                board.pop()
-                
-                if val < best_val:
-                    best_val = val
-                    best_move = move
-                beta = min(beta, best_val)
+                elapsed = time.time() - self.start_time
+                for k, (move, score, pv, line_depth) in enumerate(lines):
+                    print(f"Depth {line_depth} #{k + 1}: {move} | Score: {score:.2f} | Nodes: {self.nodes_visited} | "
+                          f"Time: {elapsed:.3f}s | PV: {' '.join(m.uci() for m in pv)}")
+                if len(new_lines) == len(lines) and not self.stop_search:
+                    self.depth_reached = depth
+
+            if self.stop_search or timer.should_stop():
+                break
 
-        return best_move, best_val
+        if not lines and self.root_moves:
+            # not even depth 1 finished, the best-ordered root move beats no move at all
+            move = self.root_moves[0][0]
+            lines = [(move, 0, (move,), 0)]
+        return lines
 
-    def get_best_move(self, board, time_limit=5.0, max_depth=50):
+    def get_best_move(self, board, time_limit=5.0, max_depth=50, workers=1,
+                      remaining=None, increment=0.0, moves_to_go=None, multipv=1):
         """
         Iterative deepening search with time control.
-        
+
         Args:
             board: Current chess position
             time_limit: Maximum time in seconds to search (default: 5.0)
             max_depth: Maximum depth to search (default: 50, acts as safety limit)
-        
+            workers: Number of processes; more than 1 runs a Lazy SMP search
+                     with helper processes sharing the transposition table
+            remaining, increment, moves_to_go: Game clock in seconds; when
+                     remaining is given the time manager budgets the move from
+                     it and time_limit is ignored
+            multipv: Number of best moves to find (analysis mode, searched in
+                     this process only, workers is ignored)
+
         Returns:
-            tuple: (best_move, final_score, depth_reached)
+            tuple: (best_move, final_score, nodes_visited, elapsed)
+            with multipv > 1 a list of (move, score, pv, depth) instead, best first
         """
+        if workers > 1 and multipv <= 1:
+            return lazy_smp_search(self, board, time_limit, max_depth, workers,
+                                   remaining, increment, moves_to_go)
+
+        timer = TimeManager(time_limit, remaining, increment, moves_to_go)
         self.nodes_visited = 0
-        self.start_time = time.time()
-        self.time_limit = time_limit
-        self.stop_search = False
-        
+        self.qsearch_nodes = 0
+        # a running iteration is only cut off at the hard limit
+        self.start_clock(timer.hard)
+        self.tt.new_search()
+        self.clear_heuristics()
+
+        if multipv > 1:
+            self.depth_reached = 0
+            lines = self.search_multipv(board, timer, max_depth, multipv)
+            elapsed = time.time() - self.start_time
+            print(f"==> MultiPV {multipv}: {len(lines)} lines | Depth: {self.depth_reached} | "
+                  f"Nodes: {self.nodes_visited} | QNodes: {self.qsearch_nodes} | Time: {elapsed:.3f}s")
+            return lines
+
         best_move = None
         best_score = 0
         depth_reached = 0
-        
+        prev_score = None
+
         # iterative deepening: search depth 1, 2, 3, ... until time runs out
+        # each iteration follows the previous PV, with the other root moves ordered
+        # by their scores and subtree sizes in the previous one
         for depth in range(1, max_depth + 1):
             if self.stop_search:
                 break
-            
+
+            # older history scores count for less in each new iteration
+            self.age_history()
+
             # Search at current depth
-            move, score = self.search_depth(board, depth)
-            
-            # If search wasn't interrupted, update best move
+            move, score = self.search_aspiration(board, depth, prev_score)
+            if board.turn == chess.BLACK:
+                white_score = -score
+            else:
+                white_score = score
+
+            if self.stop_search:
+                # an interrupted iteration only returns a move that was searched to the
+                # end and beat the previous best, otherwise the last completed depth stands
+                if move is not None:
+                    best_move = move
+                    best_score = white_score
+                    elapsed = time.time() - self.start_time
+                    print(f"Depth {depth} (partial): {move} | Score: {white_score:.2f} | "
+                          f"Nodes: {self.nodes_visited} | Time: {elapsed:.3f}s | "
+                          f"PV: {' '.join(m.uci() for m in self.pv)}")
+                break
+
+            timer.update(move, score)
+            prev_score = score
             if move is not None:
                 best_move = move
-                best_score = score
+                best_score = white_score
                 depth_reached = depth
-                
+
                 elapsed = time.time() - self.start_time
-                print(f"Depth {depth}: {move} | Score: {score:.2f} | Nodes: {self.nodes_visited} | Time: {elapsed:.3f}s")
-            
-            # Check time limit after each depth iteration (add 10% buffer)
-            if time.time() - self.start_time >= time_limit * 0.9:
+                print(f"Depth {depth}: {move} | Score: {white_score:.2f} | Nodes: {self.nodes_visited} | "
+                      f"QNodes: {self.qsearch_nodes} | Time: {elapsed:.3f}s | Hash: {self.tt.hashfull()} | "
+                      f"PV: {' '.join(m.uci() for m in self.pv)}")
+
+            # stop at the soft limit, or when the next depth could not finish before the hard one
+            if timer.should_stop():
                 break
-        
+
+        if best_move is None and self.root_moves:
+            # not even depth 1 finished, the best-ordered root move beats no move at all
+            best_move = self.root_moves[0][0]
+
+        self.depth_reached = depth_reached
         elapsed = time.time() - self.start_time
-        print(f"==> Final: {best_move} | Depth: {depth_reached} | Nodes: {self.nodes_visited} | Time: {elapsed:.3f}s")
-        
+        print(f"==> Final: {best_move} | Depth: {depth_reached} | Nodes: {self.nodes_visited} | "
+              f"QNodes: {self.qsearch_nodes} | Time: {elapsed:.3f}s")
+
         return best_move, best_score, self.nodes_visited, elapsed
 
 
@@ -277,23 +201,24 @@ class SearchEngineTimed:
     def get_best_move_depth(self, board, depth=3):
         """
         Legacy method for fixed-depth search (for compatibility with old code)
-        
+
         Args:
             board: Current chess position
             depth: Fixed depth to search
-        
+
         Returns:
             tuple: (best_move, score)
         """
         self.nodes_visited = 0
-        self.start_time = time.time()
-        self.time_limit = float('inf')  # No time limit for depth-based search
-        self.stop_search = False
-        
+        self.qsearch_nodes = 0
+        self.start_clock()  # No time limit for depth-based search
+        self.tt.new_search()
+        self.clear_heuristics()
+
         move, score = self.search_depth(board, depth)
-        
+
         elapsed = time.time() - self.start_time
-        print(f"Depth: {depth} | Nodes: {self.nodes_visited} | Time: {elapsed:.3f}s")
+        print(f"Depth: {depth} | Nodes: {self.nodes_visited} | QNodes: {self.qsearch_nodes} | Time: {elapsed:.3f}s")
         print(f"Best Move: {move} | Score: {score:.2f}")
-        
-        return move, score, self.nodes_visited, elapsed
\ No newline at end of file
+
+        return move, score, self.nodes_visited, elapsed
@@ -0,0 +1,79 @@
+import chess
+
+# Static Exchange Evaluation.
+# Plays out every capture on one square, always recapturing with the least
+# valuable attacker, and returns the material balance of the whole exchange.
+# Sliders hidden behind a piece that has just captured (x-rays) join in as
+# soon as the square in front of them is vacated.
+
+# piece values in pawns, indexed by piece type (the king only ever captures last)
+SEE_VALUES = [0, 1, 3, 3, 5, 9, 100]
+
+
+def attackers_to(board, square, occupied):
+    """Bitboard of the pieces of both colours attacking `square` with the given occupancy."""
+    queens_and_rooks = board.queens | board.rooks
+    queens_and_bishops = board.queens | board.bishops
+    return ((chess.BB_KING_ATTACKS[square] & board.kings)
+            | (chess.BB_KNIGHT_ATTACKS[square] & board.knights)
+            | (chess.BB_RANK_ATTACKS[square][chess.BB_RANK_MASKS[square] & occupied] & queens_and_rooks)
+            | (chess.BB_FILE_ATTACKS[square][chess.BB_FILE_MASKS[square] & occupied] & queens_and_rooks)
+            | (chess.BB_DIAG_ATTACKS[square][chess.BB_DIAG_MASKS[square] & occupied] & queens_and_bishops)
+            | (chess.BB_PAWN_ATTACKS[chess.BLACK][square] & board.pawns & board.occupied_co[chess.WHITE])
+            | (chess.BB_PAWN_ATTACKS[chess.WHITE][square] & board.pawns & board.occupied_co[chess.BLACK])
+            ) & occupied
+
+
+def see(board, move):
+    """
+    Material gained (in pawns) by the side to move when it plays `move` and
+    both sides keep recapturing on the target square while it pays off.
+    Negative means the capture loses material. Castling scores 0.
+    """
+    from_sq = move.from_square
+    to_sq = move.to_square
+    attacker = board.piece_type_at(from_sq)
+    if attacker == chess.KING and board.is_castling(move):
+        return 0
+
+    occupied = board.occupied ^ chess.BB_SQUARES[from_sq]
+    victim = board.piece_type_at(to_sq)
+    if victim is None and attacker == chess.PAWN and to_sq == board.ep_square:
+        # en passant: the captured pawn is not on the target square
+        victim = chess.PAWN
+        occupied ^= chess.BB_SQUARES[to_sq - 8 if board.turn == chess.WHITE else to_sq + 8]
+
+    gain = [SEE_VALUES[victim] if victim else 0]
+    if move.promotion:
+        gain[0] += SEE_VALUES[move.promotion] - SEE_VALUES[chess.PAWN]
+        attacker = move.promotion
+    # value of the piece now standing on the square, next in line to be taken
+    on_square = SEE_VALUES[attacker]
+
+    pieces = [0, board.pawns, board.knights, board.bishops, board.rooks, board.queens, board.kings]
+    side = not board.turn
+    attackers = attackers_to(board, to_sq, occupied)
+    while True:
+        ours = attackers & board.occupied_co[side]
+        if not ours:
+            break
+        # least valuable attacker
+        for pt in range(chess.PAWN, chess.KING + 1):
+            candidates = ours & pieces[pt]
+            if candidates:
+                break
+        # the king cannot capture into a defended square
+        if pt == chess.KING and attackers & board.occupied_co[not side]:
+            break
+
+        gain.append(on_square - gain[-1])
+        on_square = SEE_VALUES[pt]
+        occupied ^= candidates & -candidates
+        # removing the capturer may uncover a slider behind it
+        attackers = attackers_to(board, to_sq, occupied)
+        side = not side
+
+    # either side may stop capturing when going on would lose material
+    for d in range(len(gain) - 1, 0, -1):
+        gain[d - 1] = -max(-gain[d - 1], gain[d])
+    return gain[0]
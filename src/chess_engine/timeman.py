@@ -0,0 +1,104 @@
+import time
+
+# Time management for the iterative deepening search.
+# A move gets two limits: the soft limit is the time we plan to spend, checked
+# between iterations, the hard limit is where a running iteration is cut off.
+# A new depth is only started when its predicted cost (last iteration's time
+# times the observed branching factor) still fits under the hard limit, so no
+# time goes into iterations that cannot finish.
+
+MOVES_TO_GO = 30        # moves assumed left in the game when the clock does not say
+MOVE_OVERHEAD = 0.05    # seconds kept back every move for GUI / communication lag
+INCREMENT_SHARE = 0.75  # part of the increment spent on the current move
+HARD_FACTOR = 4.0       # the hard limit may stretch the soft limit this far...
+MAX_CLOCK_SHARE = 0.4   # ...but never past this share of the remaining clock
+# with a fixed time per move the plan is this share of it, the rest is left for
+# the extensions below (an unstable best move or a dropping score)
+FIXED_SOFT_SHARE = 0.5
+
+# branching factor used to predict the next iteration before two have been timed
+DEFAULT_EBF = 3.0
+MIN_EBF = 1.5
+MAX_EBF = 8.0
+MIN_TIMED_ITERATION = 0.005  # iterations faster than this (seconds) are too noisy to predict from
+
+# the soft limit grows when the search is unsure about the move
+INSTABILITY_BONUS = 0.4  # per change of the best move
+INSTABILITY_DECAY = 0.8  # scale factor towards 1.0 after every stable iteration
+SCORE_DROP = 0.3         # pawns lost since the previous iteration that count as a drop
+SCORE_DROP_SCALE = 1.6   # soft limit scale when the score dropped
+MAX_SOFT_SCALE = 3.0
+
+
+class TimeManager:
+    """
+    Soft/hard time limits for one move.
+
+    Either a fixed time per move (time_limit) or a game clock: remaining time,
+    increment and moves to go, all in seconds. The clock wins when both are given.
+    """
+    def __init__(self, time_limit=5.0, remaining=None, increment=0.0, moves_to_go=None):
+        if remaining is None:
+            # fixed move time: never exceeded, and only used up when the search is unsure
+            self.hard = time_limit
+            self.soft = time_limit * FIXED_SOFT_SHARE
+        else:
+            usable = max(remaining - MOVE_OVERHEAD, 0.01)
+            self.hard = min(usable * MAX_CLOCK_SHARE,
+                            (usable / (moves_to_go or MOVES_TO_GO) + increment * INCREMENT_SHARE) * HARD_FACTOR)
+            if moves_to_go == 1:
+                # last move before the time control, no reason to save anything
+                self.hard = usable
+            self.soft = min(usable / (moves_to_go or MOVES_TO_GO) + increment * INCREMENT_SHARE, self.hard)
+
+        self.start_time = time.time()
+        self.scale = 1.0
+        self.iteration_times = []
+        self.last_elapsed = 0.0
+        self.best_move = None
+        self.prev_score = None
+
+    def elapsed(self):
+        """Seconds since the search started."""
+        return time.time() - self.start_time
+
+    def update(self, move, score):
+        """
+        Record a completed iteration: its best move and score (side to move's
+        point of view). A new best move or a falling score buys extra time.
+        """
+        now = self.elapsed()
+        self.iteration_times.append(now - self.last_elapsed)
+        self.last_elapsed = now
+
+        if self.best_move is not None and move != self.best_move:
+            self.scale += INSTABILITY_BONUS
+        else:
+            self.scale = 1.0 + (self.scale - 1.0) * INSTABILITY_DECAY
+        if self.prev_score is not None and score < self.prev_score - SCORE_DROP:
+            self.scale = max(self.scale, SCORE_DROP_SCALE)
+        self.scale = min(self.scale, MAX_SOFT_SCALE)
+
+        self.best_move = move
+        self.prev_score = score
+
+    def predict_next(self):
+        """Expected duration of the next iteration in seconds."""
+        if not self.iteration_times:
+            return 0.0
+        last = self.iteration_times[-1]
+        ebf = DEFAULT_EBF
+        if len(self.iteration_times) >= 2 and self.iteration_times[-2] >= MIN_TIMED_ITERATION:
+            ebf = min(max(last / self.iteration_times[-2], MIN_EBF), MAX_EBF)
+        return last * ebf
+
+    def soft_limit(self):
+        """Soft limit including the current extension."""
+        return min(self.soft * self.scale, self.hard)
+
+    def should_stop(self):
+        """Checked between iterations: True when the next depth should not be started."""
+        elapsed = self.elapsed()
+        if elapsed >= self.soft_limit():
+            return True
+        return elapsed + self.predict_next() > self.hard
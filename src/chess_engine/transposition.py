@@ -0,0 +1,262 @@
+import math
+from array import array
+from multiprocessing import shared_memory
+import chess
+
+# bound types stored with each entry
+TT_EXACT = 0  # exact score (PV node)
+TT_LOWER = 1  # fail-high, score >= beta
+TT_UPPER = 2  # fail-low, score <= alpha
+
+# mate score used by the search (in pawns, the depth left is added on top)
+MATE_SCORE = 99999
+# mate score returned by the evaluator for a checkmated leaf
+EVAL_MATE_SCORE = 9999
+
+# every slot is one 64-bit word:
+#   bits  0-15  upper 16 bits of the Zobrist key (collision check)
+#   bits 16-31  best move: from | to << 6 | promotion << 12 (0 = no move)
+#   bits 32-47  score as int16 centipawns, stored with a +32768 offset
+#   bits 48-55  search depth
+#   bits 56-57  bound type
+#   bits 58-63  generation (age)
+ENTRY_SIZE = 8
+
+# int16 codes for mate scores, which do not fit in centipawns
+MATE_CODE = 32000
+EVAL_MATE_CODE = 31999
+MAX_CP = 31000
+
+
+def pack_move(move):
+    """chess.Move -> 16-bit int (0 for no move)."""
+    if move is None:
+        return 0
+    return move.from_square | (move.to_square << 6) | ((move.promotion or 0) << 12)
+
+
+def unpack_move(data):
+    """16-bit int -> chess.Move (None for no move)."""
+    if data == 0:
+        return None
+    return chess.Move(data & 0x3F, (data >> 6) & 0x3F, (data >> 12) or None)
+
+
+def pack_score(score, flag=TT_EXACT):
+    """
+    Search score in pawns -> int16 code.
+    Bounds are rounded to whole centipawns on the safe side (a LOWER bound
+    down, an UPPER bound up) so the stored bound never claims more than the
+    search proved; only EXACT scores are rounded to the nearest centipawn.
+    """
+    sign = 1 if score >= 0 else -1
+    mag = abs(score)
+    if mag >= MATE_SCORE:
+        return sign * (MATE_CODE + min(int(mag) - MATE_SCORE, 700))
+    if mag >= EVAL_MATE_SCORE:
+        return sign * EVAL_MATE_CODE
+    cp = score * 100
+    # the epsilon keeps float noise (3.76 * 100 = 375.999...) from costing a centipawn
+    if flag == TT_LOWER:
+        cp = math.floor(cp + 1e-9)
+    elif flag == TT_UPPER:
+        cp = math.ceil(cp - 1e-9)
+    else:
+        cp = round(cp)
+    return max(-MAX_CP, min(cp, MAX_CP))
+
+
+def unpack_score(code):
+    """int16 code -> search score in pawns."""
+    mag = abs(code)
+    sign = 1 if code >= 0 else -1
+    if mag >= MATE_CODE:
+        return sign * (MATE_SCORE + mag - MATE_CODE)
+    if mag == EVAL_MATE_CODE:
+        return sign * float(EVAL_MATE_SCORE)
+    return code / 100.0
+
+
+def pack_entry(check, depth, score, flag, move, generation):
+    """Entry fields -> one 64-bit word (move already packed)."""
+    return (check
+            | (move << 16)
+            | ((pack_score(score, flag) + 32768) << 32)
+            | (min(depth, 255) << 48)
+            | (flag << 56)
+            | (generation << 58))
+
+
+def unpack_entry(data):
+    """One 64-bit word -> (depth, score, flag, best_move)."""
+    return ((data >> 48) & 0xFF,
+            unpack_score(((data >> 32) & 0xFFFF) - 32768),
+            (data >> 56) & 0x3,
+            unpack_move((data >> 16) & 0xFFFF))
+
+
+class TranspositionTable:
+    """
+    Fixed-size transposition table indexed by the low bits of the Zobrist key.
+
+    Entries are packed into a preallocated array of 64-bit words, so the table
+    costs exactly size_mb of memory and storing never allocates.
+
+    Every bucket has two slots:
+    - slot 0 is depth-preferred: only overwritten by a deeper (or equal) search
+      of any position, or when the stored entry is left over from an older search
+    - slot 1 is always-replace: catches everything slot 0 refused
+    """
+    def __init__(self, size_mb=16):
+        self.size_mb = size_mb
+
+        # number of buckets rounded down to a power of two so we can mask the key
+        num_buckets = max(1, (size_mb * 1024 * 1024) // (2 * ENTRY_SIZE))
+        self.num_buckets = 1 << (num_buckets.bit_length() - 1)
+        self.mask = self.num_buckets - 1
+
+        self.table = array('Q', bytes(2 * ENTRY_SIZE * self.num_buckets))
+
+        # generation counter, bumped once per search to age out old entries
+        self.generation = 0
+
+    def clear(self):
+        """Remove all entries."""
+        self.table = array('Q', bytes(2 * ENTRY_SIZE * self.num_buckets))
+        self.generation = 0
+
+    def new_search(self):
+        """Start a new search: entries from previous searches become replaceable."""
+        self.generation = (self.generation + 1) & 0x3F
+
+    def probe(self, key):
+        """
+        Look up a position.
+        Returns (depth, score, flag, best_move) or None if not stored.
+        """
+        idx = (key & self.mask) << 1
+        check = key >> 48
+        for data in (self.table[idx], self.table[idx + 1]):
+            if data and (data & 0xFFFF) == check:
+                return unpack_entry(data)
+        return None
+
+    def store(self, key, depth, score, flag, best_move):
+        """Store a search result using the depth-preferred + always-replace scheme."""
+        idx = (key & self.mask) << 1
+        check = key >> 48
+        move = pack_move(best_move)
+
+        old = self.table[idx]
+        old_same = old and (old & 0xFFFF) == check
+        if (not old or old_same or (old >> 58) != self.generation
+                or depth >= ((old >> 48) & 0xFF)):
+            # keep the previous best move if the new search did not produce one
+            if move == 0 and old_same:
+                move = (old >> 16) & 0xFFFF
+            slot = idx
+        else:
+            slot = idx + 1
+
+        self.table[slot] = pack_entry(check, depth, score, flag, move, self.generation)
+
+    def hashfull(self):
+        """Permille of sampled slots used by the current search (UCI style)."""
+        sample = min(1000, len(self.table))
+        used = 0
+        for i in range(sample):
+            data = self.table[i]
+            if data and (data >> 58) == self.generation:
+                used += 1
+        return used * 1000 // sample
+
+
+class SharedTranspositionTable(TranspositionTable):
+    """
+    Transposition table living in multiprocessing.shared_memory, so several
+    search processes (Lazy SMP) can read and write the same entries.
+
+    There are no locks. Every slot is two words: (key ^ data, data). A probe only
+    accepts the slot if the two words XOR back to the full key, so an entry torn
+    by two processes writing at the same time is simply treated as a miss.
+
+    The creating process owns the block and must call close() to free it;
+    workers attach by name.
+    """
+    def __init__(self, size_mb=16, name=None):
+        self.size_mb = size_mb
+
+        # two slots of two words each per bucket
+        num_buckets = max(1, (size_mb * 1024 * 1024) // (4 * ENTRY_SIZE))
+        self.num_buckets = 1 << (num_buckets.bit_length() - 1)
+        self.mask = self.num_buckets - 1
+
+        nbytes = 4 * ENTRY_SIZE * self.num_buckets
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=nbytes)
+            self.shm.buf[:nbytes] = bytes(nbytes)
+            self.owner = True
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            self.owner = False
+        self.name = self.shm.name
+        self.table = self.shm.buf[:nbytes].cast('Q')
+
+        self.generation = 0
+
+    def close(self):
+        """Detach from the shared block (and free it if we created it)."""
+        self.table.release()
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+    def clear(self):
+        """Remove all entries."""
+        nbytes = len(self.table) * ENTRY_SIZE
+        self.shm.buf[:nbytes] = bytes(nbytes)
+        self.generation = 0
+
+    def probe(self, key):
+        """
+        Look up a position.
+        Returns (depth, score, flag, best_move) or None if not stored.
+        """
+        idx = (key & self.mask) << 2
+        table = self.table
+        for slot in (idx, idx + 2):
+            data = table[slot + 1]
+            if data and (table[slot] ^ data) == key:
+                return unpack_entry(data)
+        return None
+
+    def store(self, key, depth, score, flag, best_move):
+        """Store a search result using the depth-preferred + always-replace scheme."""
+        idx = (key & self.mask) << 2
+        table = self.table
+        move = pack_move(best_move)
+
+        old = table[idx + 1]
+        old_same = old and (table[idx] ^ old) == key
+        if (not old or old_same or (old >> 58) != self.generation
+                or depth >= ((old >> 48) & 0xFF)):
+            # keep the previous best move if the new search did not produce one
+            if move == 0 and old_same:
+                move = (old >> 16) & 0xFFFF
+            slot = idx
+        else:
+            slot = idx + 2
+
+        data = pack_entry(key >> 48, depth, score, flag, move, self.generation)
+        table[slot] = key ^ data
+        table[slot + 1] = data
+
+    def hashfull(self):
+        """Permille of sampled slots used by the current search (UCI style)."""
+        sample = min(1000, len(self.table) // 2)
+        used = 0
+        for i in range(sample):
+            data = self.table[2 * i + 1]
+            if data and (data >> 58) == self.generation:
+                used += 1
+        return used * 1000 // sample
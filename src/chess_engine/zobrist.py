@@ -0,0 +1,110 @@
+import chess
+import chess.polyglot
+
+# Incremental Zobrist hashing.
+# Uses the polyglot random numbers so keys match chess.polyglot.zobrist_hash(board)
+# and the opening book, but the key of a child position is derived from its parent
+# with a few XORs instead of rescanning all 64 squares.
+
+RANDOM = chess.polyglot.POLYGLOT_RANDOM_ARRAY
+
+# PIECE_KEYS[color][piece_type][square], polyglot orders pieces black pawn, white pawn, ...
+PIECE_KEYS = [[[0] * 64 for _ in range(7)] for _ in range(2)]
+for color in [chess.BLACK, chess.WHITE]:
+    for pt in range(chess.PAWN, chess.KING + 1):
+        for sq in range(64):
+            PIECE_KEYS[color][pt][sq] = RANDOM[64 * ((pt - 1) * 2 + int(color)) + sq]
+
+# castling rights are stored by python-chess as the rook squares
+CASTLING_KEYS = [
+    (chess.BB_H1, RANDOM[768]),
+    (chess.BB_A1, RANDOM[769]),
+    (chess.BB_H8, RANDOM[770]),
+    (chess.BB_A8, RANDOM[771]),
+]
+EP_KEYS = RANDOM[772:780]
+TURN_KEY = RANDOM[780]
+
+
+def castling_hash(castling_rights):
+    """Hash of a castling rights bitboard."""
+    key = 0
+    for bb, value in CASTLING_KEYS:
+        if castling_rights & bb:
+            key ^= value
+    return key
+
+
+def ep_hash(board):
+    """
+    Hash of the en passant file. Like polyglot, it only counts when a pawn of
+    the side to move stands next to the double-pushed pawn.
+    """
+    if board.ep_square is None:
+        return 0
+    if board.turn == chess.WHITE:
+        pushed = chess.BB_SQUARES[board.ep_square - 8]
+    else:
+        pushed = chess.BB_SQUARES[board.ep_square + 8]
+    if (chess.shift_left(pushed) | chess.shift_right(pushed)) & board.pawns & board.occupied_co[board.turn]:
+        return EP_KEYS[chess.square_file(board.ep_square)]
+    return 0
+
+
+def key_after_move(board, key, move):
+    """
+    Returns the key of the position after `move`, given the key of the current
+    position. Must be called *before* the move is pushed.
+    Handles captures, promotions, castling, en passant and null moves.
+    """
+    us = board.turn
+    them = not us
+
+    # side to move flips and the old en passant file drops out
+    key ^= TURN_KEY ^ ep_hash(board)
+    if not move:
+        # null move: nothing else changes
+        return key
+
+    from_sq = move.from_square
+    to_sq = move.to_square
+    pt = board.piece_type_at(from_sq)
+    our_keys = PIECE_KEYS[us]
+
+    key ^= our_keys[pt][from_sq]
+
+    if pt == chess.KING and board.is_castling(move):
+        # king lands on the g/c file, rook jumps to the f/d file
+        rank = chess.square_rank(from_sq)
+        if chess.square_file(to_sq) > chess.square_file(from_sq):
+            rook_from, rook_to, king_to = chess.square(7, rank), chess.square(5, rank), chess.square(6, rank)
+        else:
+            rook_from, rook_to, king_to = chess.square(0, rank), chess.square(3, rank), chess.square(2, rank)
+        key ^= our_keys[chess.ROOK][rook_from] ^ our_keys[chess.ROOK][rook_to] ^ our_keys[chess.KING][king_to]
+    else:
+        captured = board.piece_type_at(to_sq)
+        if captured:
+            key ^= PIECE_KEYS[them][captured][to_sq]
+        elif pt == chess.PAWN and to_sq == board.ep_square:
+            # en passant: the captured pawn is behind the target square
+            captured_sq = to_sq - 8 if us == chess.WHITE else to_sq + 8
+            key ^= PIECE_KEYS[them][chess.PAWN][captured_sq]
+        key ^= our_keys[move.promotion or pt][to_sq]
+
+    # castling rights lost by moving the king / a rook, or by a rook being captured.
+    # The key hashes the cleaned rights (a right without its king and rook in
+    # place does not count), like chess.polyglot.zobrist_hash
+    rights = board.clean_castling_rights() if board.castling_rights else 0
+    new_rights = rights & ~chess.BB_SQUARES[from_sq] & ~chess.BB_SQUARES[to_sq]
+    if pt == chess.KING:
+        new_rights &= ~(chess.BB_RANK_1 if us == chess.WHITE else chess.BB_RANK_8)
+    if new_rights != rights:
+        key ^= castling_hash(rights) ^ castling_hash(new_rights)
+
+    # new en passant file after a double pawn push, if the opponent can use it
+    if pt == chess.PAWN and abs(to_sq - from_sq) == 16:
+        pushed = chess.BB_SQUARES[to_sq]
+        if (chess.shift_left(pushed) | chess.shift_right(pushed)) & board.pawns & board.occupied_co[them]:
+            key ^= EP_KEYS[chess.square_file(to_sq)]
+
+    return key
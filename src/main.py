@@ -2,12 +2,15 @@ import chess
 from chess_engine.evaluator import ClassicEvaluator
 # from chess_engine.search import SearchEngine
 from chess_engine.search_open_book import SearchEngineWithOpenings
+from chess_engine.ponder import Ponderer
 
 class ChessBot:
-    def __init__(self):
+    def __init__(self, ponder=True):
         self.board = chess.Board()
         self.evaluator = ClassicEvaluator()
         self.search_engine = SearchEngineWithOpenings(self.evaluator)
+        # think on the opponent's time
+        self.ponderer = Ponderer(self.search_engine) if ponder else None
 
     def get_best_move(self, depth=3):
         """
@@ -27,8 +30,23 @@ class ChessBot:
         elif phase <= 5:
             depth += 2
 
+        # the expected reply came: the background search already did (most of) the work
+        if self.ponderer is not None:
+            result = self.ponderer.finish(self.board, depth)
+            if result is not None:
+                return result
+
         best_move = self.search_engine.get_best_move(self.board, depth)
         return best_move
+
+    def start_pondering(self):
+        """Search the expected reply in the background while the opponent thinks"""
+        if self.ponderer is not None:
+            self.ponderer.start(self.board)
+
+    def stop_pondering(self):
+        if self.ponderer is not None:
+            self.ponderer.stop()
     
 
 def console_mode():
@@ -55,7 +73,9 @@ def console_mode():
             # Human Turn
             while True:
                 move_str = input("Your move: ")
-                if move_str == "quit": return
+                if move_str == "quit":
+                    bot.stop_pondering()
+                    return
                 
                 try:
                     # Try parsing SAN first (e.g. "Nf3"), then UCI (e.g. "g1f3")
@@ -77,7 +97,9 @@ def console_mode():
             best_move, score, time = bot.get_best_move(depth=4) # depth
             bot.board.push(best_move)
             print(f"After {time:.2f}s bot played: {best_move}")
+            bot.start_pondering()
 
+    bot.stop_pondering()
     print("Game Over!")
     print(bot.board.outcome())
 
@@ -0,0 +1,71 @@
+"""
+Lazy SMP effective-speedup benchmark.
+
+Searches a set of positions to a fixed depth with 1 process and with N
+processes and compares time-to-depth. Raw node throughput (NPS) always grows
+with more processes; the effective speedup (time with 1 process / time with N)
+is what actually buys extra depth.
+
+Usage:
+    python smp_benchmark.py                  # 4 processes, depth 5
+    python smp_benchmark.py --workers 16 --depth 7
+"""
+import argparse
+import chess
+from chess_engine.evaluator import ClassicEvaluator
+from chess_engine.search_timed import SearchEngineTimed
+
+POSITIONS = [
+    ("Italian Game", "r1bqk1nr/pppp1ppp/2n5/2b1p3/2B1P3/5N2/PPPP1PPP/RNBQK2R w KQkq - 4 4"),
+    ("tactical #3", "r1b2rk1/pp3ppp/2n1pn2/2b5/2B1P3/2N2N2/PPP2PPP/R1BR2K1 w - - 2 9"),
+    ("positional #1", "2rq1rk1/pp2bppp/2n1pn2/3p4/3P1B2/2NB1N2/PP3PPP/2RQ1RK1 w - - 2 12"),
+    ("Kiwipete", "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1"),
+    ("endgame #3", "8/6p1/5p2/4p3/1Bp1k3/6P1/5P2/4K3 w - - 4 60"),
+]
+
+
+def time_to_depth(fen, depth, workers):
+    """Fresh engine (empty TT) so both runs start from the same state"""
+    engine = SearchEngineTimed(ClassicEvaluator())
+    board = chess.Board(fen)
+    move, _score, nodes, elapsed = engine.get_best_move(board, time_limit=float('inf'),
+                                                        max_depth=depth, workers=workers)
+    engine.shutdown_pool()
+    return move, nodes, elapsed
+
+
+def run_benchmark(workers=4, depth=5):
+    rows = []
+    for name, fen in POSITIONS:
+        move_1, nodes_1, time_1 = time_to_depth(fen, depth, 1)
+        move_n, nodes_n, time_n = time_to_depth(fen, depth, workers)
+        rows.append((name, move_1, move_n, nodes_1 / time_1, nodes_n / time_n, time_1, time_n))
+
+    print()
+    print("=" * 88)
+    print(f"Lazy SMP benchmark  |  depth = {depth}  |  processes = {workers}")
+    print("=" * 88)
+    print(f"{'Position':<16} {'Move x1':<8} {'Move xN':<8} {'NPS x1':>10} {'NPS xN':>10} "
+          f"{'Time x1':>9} {'Time xN':>9} {'Speedup':>8}")
+    print("-" * 88)
+    total_1 = total_n = 0
+    for name, move_1, move_n, nps_1, nps_n, time_1, time_n in rows:
+        total_1 += time_1
+        total_n += time_n
+        print(f"{name:<16} {str(move_1):<8} {str(move_n):<8} {nps_1:>10.0f} {nps_n:>10.0f} "
+              f"{time_1:>8.2f}s {time_n:>8.2f}s {time_1 / time_n:>7.2f}x")
+    print("-" * 88)
+    print(f"Effective speedup (total time to depth): {total_1 / total_n:.2f}x")
+
+    return total_1 / total_n
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Lazy SMP effective-speedup benchmark")
+    parser.add_argument("--workers", type=int, default=4,
+                        help="Number of search processes (default: 4)")
+    parser.add_argument("--depth", type=int, default=5,
+                        help="Depth every search has to complete (default: 5)")
+    args = parser.parse_args()
+
+    run_benchmark(workers=args.workers, depth=args.depth)
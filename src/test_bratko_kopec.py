@@ -36,10 +36,12 @@ BK_POSITIONS = [
 ]
 
 SEARCH_DEPTH = 4
+# worker processes for the root-split parallel search (1 = serial)
+WORKERS = 1
 # failing posiitons from last iteration
 FAILING = [1, 2, 3, 4, 7, 9, 10, 11, 13, 16, 18, 20, 22, 23, 24]
 
-def run_bk_test(depth: int = SEARCH_DEPTH):
+def run_bk_test(depth: int = SEARCH_DEPTH, workers: int = WORKERS):
     evaluator = ClassicEvaluator()
     engine = SearchEngine(evaluator)
 
@@ -48,10 +50,10 @@ def run_bk_test(depth: int = SEARCH_DEPTH):
     total = len(BK_POSITIONS)
     total_failing = len(FAILING)
 
-    print(f"Bratko-Kopec Test  |  depth = {depth}")
-    print("=" * 70)
-    print(f"{'#':<4} {'Result':<8} {'Played':<10} {'Expected':<25} {'Score'}")
-    print("-" * 70)
+    print(f"Bratko-Kopec Test  |  depth = {depth}  |  workers = {workers}")
+    print("=" * 86)
+    print(f"{'#':<4} {'Result':<8} {'Played':<10} {'Expected':<25} {'Score':<8} {'Nodes':>9} {'QS %':>6}")
+    print("-" * 86)
 
     filtered_positions = [(i, BK_POSITIONS[i-1]) for i in FAILING]
     for i, epd in filtered_positions:
@@ -72,7 +74,7 @@ def run_bk_test(depth: int = SEARCH_DEPTH):
         expected_moves: list[chess.Move] = ops["bm"]
 
         # Run engine
-        best_move, score, _elapsed = engine.get_best_move(board, depth=depth)
+        best_move, score, _elapsed = engine.get_best_move(board, depth=depth, workers=workers)
 
         solved = best_move in expected_moves
         if solved:
@@ -85,9 +87,15 @@ def run_bk_test(depth: int = SEARCH_DEPTH):
         result_str   = "✓ SOLVED" if solved else "✗ FAILED"
         score_str    = f"{score/100:.2f}" if isinstance(score, (int, float)) else str(score)
 
-        print(f"{i:<4} {result_str:<8} {played_san:<10} {expected_san:<25} {score_str}")
+        # share of the nodes spent in quiescence
+        qs_pct = 100 * engine.qsearch_nodes / max(engine.nodes_visited, 1)
 
-    print("=" * 70)
+        print(f"{i:<4} {result_str:<8} {played_san:<10} {expected_san:<25} {score_str:<8} "
+              f"{engine.nodes_visited:>9} {qs_pct:>5.1f}%")
+
+    engine.shutdown_pool()
+
+    print("=" * 86)
     pct = 100 * solved_count / total_failing
     print(f"Score: {solved_count} / {total}  ({pct:.1f}%)")
     print("Failed:", failed_indices)
@@ -111,4 +119,4 @@ def run_bk_test(depth: int = SEARCH_DEPTH):
 
 
 if __name__ == "__main__":
-    run_bk_test(depth=SEARCH_DEPTH)    
+    run_bk_test(depth=SEARCH_DEPTH, workers=WORKERS)    
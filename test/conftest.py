@@ -0,0 +1,8 @@
+import os
+import sys
+
+# the engine package lives in src/
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+# comparison scripts that need a local Stockfish binary, run them by hand
+collect_ignore = ["test_engine.py", "test_evaluator.py", "fens_test_suite.py"]
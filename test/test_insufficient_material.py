@@ -0,0 +1,40 @@
+import random
+import chess
+from chess_engine.search import insufficient_material
+
+# kings plus up to three minor pieces (and sometimes one major piece or pawn)
+EXTRA_PIECES = [chess.KNIGHT, chess.BISHOP, chess.BISHOP, chess.KNIGHT, chess.BISHOP]
+
+
+def random_ending(rng):
+    board = chess.Board(None)
+    squares = rng.sample(chess.SQUARES, 6)
+    board.set_piece_at(squares[0], chess.Piece(chess.KING, chess.WHITE))
+    board.set_piece_at(squares[1], chess.Piece(chess.KING, chess.BLACK))
+    for square in squares[2:2 + rng.randint(0, 3)]:
+        board.set_piece_at(square, chess.Piece(rng.choice(EXTRA_PIECES), rng.choice(chess.COLORS)))
+    if rng.random() < 0.1:
+        piece_type = rng.choice([chess.PAWN, chess.ROOK, chess.QUEEN])
+        square = squares[5]
+        if piece_type != chess.PAWN or chess.BB_SQUARES[square] & ~chess.BB_BACKRANKS:
+            board.set_piece_at(square, chess.Piece(piece_type, rng.choice(chess.COLORS)))
+    board.turn = rng.choice(chess.COLORS)
+    return board
+
+
+def test_matches_python_chess_on_random_endings():
+    rng = random.Random(16)
+    for _ in range(20000):
+        board = random_ending(rng)
+        assert insufficient_material(board) == board.is_insufficient_material(), board.fen()
+
+
+def test_known_positions():
+    assert insufficient_material(chess.Board("8/8/4k3/8/8/3K4/8/8 w - - 0 1"))
+    assert insufficient_material(chess.Board("8/8/4k3/8/8/3KN3/8/8 w - - 0 1"))
+    # same coloured bishops on both sides
+    assert insufficient_material(chess.Board("8/8/4k1b1/8/8/3K4/2B5/8 w - - 0 1"))
+    # opposite coloured bishops can still mate
+    assert not insufficient_material(chess.Board("8/8/4kb2/8/8/3K4/2B5/8 w - - 0 1"))
+    assert not insufficient_material(chess.Board("8/8/4k3/8/8/3KNN2/8/8 w - - 0 1"))
+    assert not insufficient_material(chess.Board("8/8/4k3/8/8/3K4/4P3/8 w - - 0 1"))
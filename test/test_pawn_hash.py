@@ -0,0 +1,47 @@
+import random
+import chess
+import pytest
+from chess_engine.evaluator import ClassicEvaluator
+
+# scores of the evaluator before the pawn hash (pawn terms recomputed every call)
+REFERENCE_SCORES = [
+    ("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1", 0.15),
+    ("r1b2rk1/pp3ppp/2n1pn2/2b5/2B1P3/2N2N2/PPP2PPP/R1BR2K1 w - - 2 9", 1.3233333333333333),
+    ("rnbq1rk1/pp2bppp/4pn2/2pp4/2PP4/2N1PN2/PP2BPPP/R1BQ1RK1 w - - 0 1", 0.58),
+    ("rnbqk2r/pp2bppp/4pn2/2ppP3/3P4/2N2N2/PPP2PPP/R1BQKB1R b KQkq - 0 5", 0.44),
+    ("r1bq1rk1/1p3pp1/p1n2n1p/2pp4/3P4/2P1PN2/PP1N1PPP/R1BQ1RK1 b - - 3 10", -0.0925),
+    ("8/8/8/3k4/3P4/8/4K3/8 w - - 0 1", 1.18),
+    ("8/6p1/5p2/4p3/1Bp1k3/6P1/5P2/4K3 w - - 4 60", 0.5775),
+    ("8/P7/8/8/4k3/8/7p/4K3 b - - 0 60", -0.8),
+    ("8/pp3k2/2p5/P1P1p3/1P2P1p1/6P1/5K2/8 w - - 0 40", 0.36),
+    ("6k1/5p2/6p1/8/7P/8/5PPK/8 w - - 0 1", 1.17),
+]
+
+
+@pytest.mark.parametrize("fen, expected", REFERENCE_SCORES)
+def test_matches_reference_scores(fen, expected):
+    evaluator = ClassicEvaluator()
+    board = chess.Board(fen)
+    # cold pawn hash, then a hit on the same pawns
+    assert evaluator.evaluate_uncached(board) == pytest.approx(expected, abs=1e-9)
+    assert evaluator.evaluate_uncached(board) == pytest.approx(expected, abs=1e-9)
+    assert evaluator.pawn_cache_hits == 1
+
+
+def test_cached_and_uncached_paths_agree_on_random_games():
+    rng = random.Random(11)
+    cached = ClassicEvaluator()
+    # tiny pawn hash: plenty of collisions and replacements
+    small = ClassicEvaluator(eval_cache_size=0, pawn_cache_size=4)
+    plain = ClassicEvaluator(eval_cache_size=0, pawn_cache_size=0)
+    for _ in range(60):
+        board = chess.Board()
+        for _ in range(rng.randint(1, 120)):
+            moves = list(board.legal_moves)
+            if not moves:
+                break
+            board.push(rng.choice(moves))
+            expected = plain.evaluate(board)
+            assert cached.evaluate(board) == pytest.approx(expected, abs=1e-9), board.fen()
+            assert small.evaluate(board) == pytest.approx(expected, abs=1e-9), board.fen()
+    assert cached.pawn_cache_hits > 0 and small.pawn_cache_misses > 0
@@ -0,0 +1,28 @@
+import chess
+import pytest
+from chess_engine.evaluator import ClassicEvaluator
+from chess_engine.search_timed import SearchEngineTimed
+
+
+@pytest.mark.parametrize("fen", [
+    "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3",
+    "2rq1rk1/pp2bppp/2n1pn2/3p4/3P1B2/2NB1N2/PP3PPP/2RQ1RK1 w - - 2 12",
+])
+def test_completed_iteration_pv_is_full_length(fen):
+    board = chess.Board(fen)
+    engine = SearchEngineTimed(ClassicEvaluator(), tt_size_mb=1)
+    engine.start_clock(60.0)
+    engine.tt.new_search()
+    engine.clear_heuristics()
+    prev_score = None
+    for depth in range(1, 5):
+        engine.age_history()
+        move, prev_score = engine.search_aspiration(board, depth, prev_score)
+        assert not engine.stop_search
+        assert engine.pv[0] == move
+        assert len(engine.pv) == depth, (depth, [m.uci() for m in engine.pv])
+        # and the line is playable from the root
+        line = board.copy()
+        for pv_move in engine.pv:
+            assert line.is_legal(pv_move)
+            line.push(pv_move)
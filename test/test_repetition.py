@@ -0,0 +1,51 @@
+import random
+import chess
+from chess_engine.evaluator import ClassicEvaluator
+from chess_engine.search import SearchEngine
+
+
+def shuffle_move(rng, board):
+    """A random move, preferring reversible ones so positions come back"""
+    moves = list(board.legal_moves)
+    return rng.choice([move for move in moves if not board.is_zeroing(move)] or moves)
+
+
+def test_matches_python_chess_on_random_shuffles():
+    rng = random.Random(17)
+    engine = SearchEngine(ClassicEvaluator(), tt_size_mb=1)
+    checked = repetitions = 0
+    for game in range(150):
+        board = chess.Board("4k3/8/8/8/8/8/8/R3K2R w KQ - 0 1" if game % 2 else chess.STARTING_FEN)
+        # game moves before the root, then search moves after it
+        for _ in range(rng.randint(0, 40)):
+            if board.is_game_over():
+                break
+            board.push(shuffle_move(rng, board))
+        engine.set_root(board)
+        for _ in range(40):
+            if board.is_game_over():
+                break
+            engine.make_move(board, shuffle_move(rng, board))
+            expected = board.is_repetition(2)
+            assert engine.is_repetition(board) == expected, board.fen()
+            checked += 1
+            repetitions += expected
+    assert repetitions > 50 and checked > 4000
+
+
+def test_null_move_hides_older_positions():
+    board = chess.Board("4k3/8/8/8/8/8/8/R3K3 w - - 0 1")
+    engine = SearchEngine(ClassicEvaluator(), tt_size_mb=1)
+    engine.set_root(board)
+    for uci in ["a1a2", "e8d8", "a2a1", "d8e8"]:
+        engine.make_move(board, chess.Move.from_uci(uci))
+    assert engine.is_repetition(board)
+
+    # back to the same position again, but only through null moves: positions
+    # before a null move are not repetitions of the real game
+    engine.make_move(board, chess.Move.null())
+    engine.make_move(board, chess.Move.from_uci("e8d8"))
+    engine.make_move(board, chess.Move.null())
+    engine.make_move(board, chess.Move.from_uci("d8e8"))
+    assert board.board_fen() == "4k3/8/8/8/8/8/8/R3K3" and board.turn == chess.WHITE
+    assert not engine.is_repetition(board)
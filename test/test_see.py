@@ -0,0 +1,32 @@
+import chess
+import pytest
+from chess_engine.see import see
+
+SEE_CASES = [
+    # undefended pawn
+    ("1k1r4/1pp4p/p7/4p3/8/P5P1/1PP4P/2K1R3 w - - 0 1", "e1e5", 1),
+    # knight takes a defended pawn and is lost
+    ("1k1r3q/1ppn3p/p4b2/4p3/8/P2N2P1/1PP1R1BP/2K1Q3 w - - 0 1", "d3e5", -2),
+    ("4k3/8/8/3p4/4P3/8/8/4K3 w - - 0 1", "e4d5", 1),
+    # pawn for pawn
+    ("4k3/8/2p5/3p4/4P3/8/8/4K3 w - - 0 1", "e4d5", 0),
+    # the queen behind the rook joins in (x-ray)
+    ("3rk3/8/8/3p4/8/8/3R4/3QK3 w - - 0 1", "d2d5", 1),
+    ("3qk3/3r4/8/3p4/8/8/3R4/3QK3 w - - 0 1", "d2d5", -4),
+    # the king may take an undefended piece
+    ("4k3/8/8/3q4/4K3/8/8/8 w - - 0 1", "e4d5", 9),
+    # promotion counts the new piece
+    ("4k3/1P6/8/8/8/8/8/4K3 w - - 0 1", "b7b8q", 8),
+    # en passant takes the pawn behind the target square
+    ("4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 1", "e5d6", 1),
+    # castling is not an exchange
+    ("4k3/8/8/8/8/8/8/4K2R w K - 0 1", "e1g1", 0),
+]
+
+
+@pytest.mark.parametrize("fen, uci, expected", SEE_CASES)
+def test_see(fen, uci, expected):
+    board = chess.Board(fen)
+    move = chess.Move.from_uci(uci)
+    assert board.is_legal(move)
+    assert see(board, move) == expected
@@ -0,0 +1,61 @@
+import chess
+import pytest
+from chess_engine.transposition import (TranspositionTable, SharedTranspositionTable, TT_EXACT, TT_LOWER,
+                                        TT_UPPER, MATE_SCORE, EVAL_MATE_SCORE, pack_entry, unpack_entry,
+                                        pack_move, unpack_move, pack_score, unpack_score)
+
+MOVES = [None, chess.Move.from_uci("e2e4"), chess.Move.from_uci("a7a8q"), chess.Move.from_uci("h2h1n"),
+         chess.Move.from_uci("e1g1")]
+
+
+@pytest.mark.parametrize("move", MOVES)
+def test_move_round_trip(move):
+    assert unpack_move(pack_move(move)) == move
+
+
+@pytest.mark.parametrize("score", [0.0, 0.37, -0.37, 12.5, -310.0, 310.0,
+                                   float(EVAL_MATE_SCORE), -float(EVAL_MATE_SCORE),
+                                   MATE_SCORE + 120, -(MATE_SCORE + 120)])
+def test_score_round_trip(score):
+    for flag in (TT_EXACT, TT_LOWER, TT_UPPER):
+        assert unpack_score(pack_score(score, flag)) == pytest.approx(score)
+
+
+def test_bounds_round_to_the_safe_side():
+    # a lower bound never grows and an upper bound never shrinks
+    for score in (3.7596, -3.7596, 0.004, -0.004, 1.235):
+        assert unpack_score(pack_score(score, TT_LOWER)) <= score
+        assert unpack_score(pack_score(score, TT_UPPER)) >= score
+        assert abs(unpack_score(pack_score(score, TT_EXACT)) - score) <= 0.005
+
+
+def test_entry_round_trip():
+    for depth in (0, 1, 17, 255):
+        for flag in (TT_EXACT, TT_LOWER, TT_UPPER):
+            for move in MOVES:
+                data = pack_entry(0xBEEF, depth, -1.25, flag, pack_move(move), 63)
+                assert data & 0xFFFF == 0xBEEF
+                assert data >> 58 == 63
+                assert unpack_entry(data) == (depth, -1.25, flag, move)
+
+
+@pytest.mark.parametrize("table_class", [TranspositionTable, SharedTranspositionTable])
+def test_store_and_probe(table_class):
+    tt = table_class(1)
+    try:
+        key = 0x123456789ABCDEF0
+        move = chess.Move.from_uci("g1f3")
+        assert tt.probe(key) is None
+        tt.store(key, 5, 0.5, TT_EXACT, move)
+        assert tt.probe(key) == (5, 0.5, TT_EXACT, move)
+        # a shallower result of another position in the bucket goes to the second slot
+        other = key ^ (1 << 60)
+        tt.store(other, 2, -1.0, TT_UPPER, None)
+        assert tt.probe(key) == (5, 0.5, TT_EXACT, move)
+        assert tt.probe(other) == (2, -1.0, TT_UPPER, None)
+        # a result without a move keeps the stored one
+        tt.store(key, 6, 0.75, TT_LOWER, None)
+        assert tt.probe(key) == (6, 0.75, TT_LOWER, move)
+    finally:
+        if table_class is SharedTranspositionTable:
+            tt.close()
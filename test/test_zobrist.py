@@ -0,0 +1,46 @@
+import random
+import chess
+import chess.polyglot
+import pytest
+from chess_engine.zobrist import key_after_move
+
+START_FENS = [
+    chess.STARTING_FEN,
+    # castling both ways, en passant and promotions come up quickly
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+    "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+    "n1n5/PPPk4/8/8/8/8/4Kppp/5N1N b - - 0 1",
+    # castling rights that do not match the board (no rook on a1 or a8)
+    "r3k2r/8/8/8/8/8/8/4K2R w KQkq - 0 1",
+    "4k2r/8/8/8/8/8/8/R3K3 w KQkq - 0 1",
+]
+
+
+@pytest.mark.parametrize("fen", START_FENS)
+def test_matches_full_hash_on_random_games(fen):
+    rng = random.Random(fen)
+    for _ in range(40):
+        board = chess.Board(fen)
+        key = chess.polyglot.zobrist_hash(board)
+        for _ in range(60):
+            moves = list(board.legal_moves)
+            if not moves:
+                break
+            # an occasional null move, never two in a row
+            if board.move_stack and board.move_stack[-1] and not board.is_check() and rng.random() < 0.05:
+                move = chess.Move.null()
+            else:
+                move = rng.choice(moves)
+            key = key_after_move(board, key, move)
+            board.push(move)
+            assert key == chess.polyglot.zobrist_hash(board), (board.fen(), move)
+
+
+def test_uncleaned_castling_rights():
+    board = chess.Board("r3k2r/8/8/8/8/8/8/4K2R w KQkq - 0 1")
+    key = chess.polyglot.zobrist_hash(board)
+    for uci in ["e1e2", "h8h1", "e2e1"]:
+        move = chess.Move.from_uci(uci)
+        key = key_after_move(board, key, move)
+        board.push(move)
+        assert key == chess.polyglot.zobrist_hash(board), uci